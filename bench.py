@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# Offline benchmark for the polling path. For each device count, a fake Govee
+# API (fake_govee.py) is started in its own process and a worker process runs
+# check_plug_state, one poll_plugs sweep at a time, check_config and
+# run_monitor against it. Running each size in a fresh worker keeps the CPU and
+# RSS numbers for one size from leaking into the next.
+#
+#   python bench.py --sizes 10,100,1000 --json bench.json
+#
+# With --startup it instead times short-lived cli.py processes (interpreter
+# start, `import cli`, and `check` with a warm and a stale config cache), and
+# fails if importing cli pulls in any of HEAVY_MODULES.
+#
+#   python bench.py --startup --runs 20
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that `import cli` must not load; the commands that need them import them
+HEAVY_MODULES = ("requests", "urllib3", "concurrent.futures.thread", "hashlib", "sqlite3", "http.server")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def latency_summary(values):
+    return {
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return None
+
+
+# Run fn with its console output swallowed and return (result, wall seconds, cpu seconds)
+def measure(fn):
+    cpu, wall = cpu_seconds(), time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            result = fn()
+        except SystemExit as e:
+            result = e.code
+    return result, time.perf_counter() - wall, cpu_seconds() - cpu
+
+
+# Runs inside the worker process, with GOVEE_API_BASE already pointing at the fake server
+def run_worker(args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    sys.path.insert(0, HERE)
+    import cli
+    from plugs import PlugTable
+
+    base = os.environ["GOVEE_API_BASE"]
+    workdir = tempfile.mkdtemp(prefix="govee-bench-")
+    os.chdir(workdir)
+
+    session = cli.http_session(f"bench-{args.devices}", pool_size=args.concurrency, rate_limit=10 ** 9)
+    devices = session.get(cli.GOVEE_DEVICES_URL, timeout=30).json()["data"]["devices"]
+    plugs = [
+        {"device_id": d["device"], "name": d["deviceName"], "model": d["model"], "expected_power": "on"}
+        for d in devices
+    ]
+    config = {
+        "govee_api_key": f"bench-{args.devices}",
+        "pushcut_url": f"{base}/pushcut/bench",
+        "plugs": plugs,
+        "interval": 0,
+        "fail_mode": "any",
+        "concurrency": args.concurrency,
+        "rate_limit_per_minute": 10 ** 9,
+        "spread_polls": False,
+        "alert_coalesce_window": 0,
+    }
+    with open(cli.CONFIG_FILE, "w") as f:
+        json.dump(config, f)
+    table = PlugTable.from_config(config, cli.GOVEE_STATE_URL)
+    result = {"devices": args.devices, "concurrency": args.concurrency, "rss_start_mb": current_rss_mb()}
+
+    # Single-request latency of check_plug_state, called sequentially
+    latencies = []
+    for plug in table.plugs[:args.samples]:
+        _, wall, _ = measure(lambda: cli.check_plug_state(plug, session, False))
+        latencies.append(wall)
+    result["check_plug_state"] = latency_summary(latencies)
+
+    # Full concurrent sweeps
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+    sweep_times, sweep_cpu = [], 0.0
+    for _ in range(args.sweeps):
+        _, wall, cpu = measure(lambda: cli.poll_plugs(table, session, False, executor))
+        sweep_times.append(wall)
+        sweep_cpu += cpu
+    executor.shutdown()
+    total = sum(sweep_times)
+    result["sweep"] = {
+        **latency_summary(sweep_times),
+        "requests_per_second": len(table) * len(sweep_times) / total if total else None,
+        "cpu_seconds_per_sweep": sweep_cpu / len(sweep_times),
+    }
+
+    _, wall, cpu = measure(lambda: cli.check_config(False, refresh_devices=True))
+    result["check_config"] = {"seconds": wall, "cpu_seconds": cpu}
+
+    _, wall, cpu = measure(lambda: cli.run_monitor(max_sweeps=args.sweeps))
+    result["run_monitor"] = {"seconds_per_sweep": wall / args.sweeps, "cpu_seconds_per_sweep": cpu / args.sweeps}
+
+    result["rss_end_mb"] = current_rss_mb()
+    result["rss_peak_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=1):
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"fake Govee server did not start on port {port}")
+
+
+def start_fake_server(port, devices, args):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "fake_govee.py"), "--port", str(port), "--devices", str(devices),
+         "--latency", str(args.latency), "--jitter", str(args.jitter), "--timeout-rate", str(args.timeout_rate),
+         "--hang", str(args.hang), "--throttle-rate", str(args.throttle_rate), "--flap-rate", str(args.flap_rate),
+         "--seed", "1"],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    return server
+
+
+def run_size(devices, args):
+    port = free_port()
+    server = start_fake_server(port, devices, args)
+    try:
+        env = dict(os.environ, GOVEE_API_BASE=f"http://127.0.0.1:{port}")
+        worker = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--devices", str(devices),
+             "--concurrency", str(args.concurrency), "--sweeps", str(args.sweeps), "--samples", str(args.samples)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        return json.loads(worker.stdout.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# Wall time of running argv to completion `runs` times. If before is given it is
+# called ahead of every run, outside the timing.
+def time_process(argv, runs, env=None, before=None):
+    times = []
+    for _ in range(runs):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return latency_summary(times)
+
+
+def run_startup(args):
+    import urllib.request
+
+    port = free_port()
+    server = start_fake_server(port, 10, args)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        env = dict(os.environ, GOVEE_API_BASE=base)
+        with urllib.request.urlopen(f"{base}/v1/devices") as response:
+            devices = json.load(response)["data"]["devices"]
+        workdir = tempfile.mkdtemp(prefix="govee-bench-")
+        config_path = os.path.join(workdir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "govee_api_key": "bench-startup",
+                "plugs": [{"device_id": d["device"], "name": d["deviceName"], "model": d["model"]}
+                          for d in devices[:3]],
+            }, f)
+        cli_path = os.path.join(HERE, "cli.py")
+        check = [sys.executable, cli_path, "--config", config_path, "check", "--monitored-only", "--format", "json"]
+        import_cli = f"import sys; sys.path.insert(0, {HERE!r}); import cli"
+        # Warm the device list and config caches
+        subprocess.run(check, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        results = {
+            "python": time_process([sys.executable, "-c", "pass"], args.runs),
+            "import cli": time_process([sys.executable, "-c", import_cli], args.runs),
+            "check": time_process(check, args.runs, env=env),
+            "check, config changed": time_process(check, args.runs, env=env, before=lambda: os.utime(config_path)),
+        }
+        probe = subprocess.run(
+            [sys.executable, "-c", f"{import_cli}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+            capture_output=True, text=True, check=True,
+        )
+        heavy = probe.stdout.split()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'startup':<24} {'p50':>8} {'p90':>8} {'max':>8}")
+    for name, summary in results.items():
+        print(f"{name:<24} {fmt_ms(summary['p50']):>8} {fmt_ms(summary['p90']):>8} {fmt_ms(summary['max']):>8}")
+    print(f"(times in ms over {args.runs} runs)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"startup": results, "heavy_imports": heavy}, f, indent=2)
+    if heavy:
+        print(f"`import cli` loaded {', '.join(heavy)}; import them where they are used instead.")
+        sys.exit(1)
+
+
+def fmt_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def print_table(results):
+    print(f"{'devices':>8} {'plug p50':>9} {'plug p99':>9} {'sweep p50':>10} {'sweep max':>10} {'req/s':>8} "
+          f"{'cpu/sweep':>10} {'check':>9} {'run/sweep':>10} {'rss MB':>7}")
+    for r in results:
+        print(f"{r['devices']:>8} {fmt_ms(r['check_plug_state']['p50']):>9} {fmt_ms(r['check_plug_state']['p99']):>9} "
+              f"{fmt_ms(r['sweep']['p50']):>10} {fmt_ms(r['sweep']['max']):>10} "
+              f"{r['sweep']['requests_per_second']:>8.0f} {fmt_ms(r['sweep']['cpu_seconds_per_sweep']):>10} "
+              f"{fmt_ms(r['check_config']['seconds']):>9} {fmt_ms(r['run_monitor']['seconds_per_sweep']):>10} "
+              f"{r['rss_peak_mb']:>7.1f}")
+    print("(times in ms; plug = one check_plug_state call, check = one check_config run)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the monitor against a local fake Govee API")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Comma-separated device counts")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--sweeps", type=int, default=3, help="Sweeps to time per size")
+    parser.add_argument("--samples", type=int, default=50, help="Sequential check_plug_state calls to time")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake server mean latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang", type=float, default=12.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--flap-rate", type=float, default=0.0)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    parser.add_argument("--startup", action="store_true", help="Time short-lived cli.py commands instead")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per command with --startup")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--devices", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+    if args.startup:
+        return run_startup(args)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Benchmarking {size} devices...", file=sys.stderr)
+        results.append(run_size(size, args))
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,61 @@
 import json
 import os
-import requests
+import sys
+import threading
 import time
-
-
-# Helper: send pushcut notification
-def send_pushcut_notification(pushcut_url, title, text):
+from events import DEBUG, ERROR, INFO, WARNING
+from resilience import HALF_OPEN, OPEN, RequestPolicy
+
+# requests, concurrent.futures and the other heavier modules are imported where
+# they're used, so short-lived commands like `check` and `history` start fast.
+
+# Overridable so the monitor can be pointed at a local stand-in (see fake_govee.py)
+GOVEE_API_BASE = os.environ.get("GOVEE_API_BASE", "https://developer-api.govee.com")
+GOVEE_DEVICES_URL = f"{GOVEE_API_BASE}/v1/devices"
+GOVEE_STATE_URL = f"{GOVEE_API_BASE}/v1/devices/state"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT_PER_MINUTE = 100
+DEFAULT_DEVICE_CACHE_TTL = 3600
+
+# One pooled keep-alive session per Govee API key (None for Pushcut), shared by
+# every request so connections and TLS sessions are reused across polls.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# Helper: get the shared session for an API key, creating it on first use.
+# pool_size is the number of keep-alive connections kept per host; it should be
+# at least the polling concurrency or connections will be dropped and re-opened.
+# Sessions for an API key also get a RateLimiter shared by every caller of that
+# key, available as session.rate_limiter.
+def http_session(api_key=None, pool_size=DEFAULT_CONCURRENCY, rate_limit=DEFAULT_RATE_LIMIT_PER_MINUTE):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from ratelimit import RateLimitedAdapter, RateLimiter
+    with _sessions_lock:
+        session = _sessions.get(api_key)
+        if session is None:
+            session = requests.Session()
+            if api_key:
+                session.rate_limiter = RateLimiter(rate_limit)
+                adapter = RateLimitedAdapter(session.rate_limiter, pool_connections=4, pool_maxsize=max(1, pool_size))
+            else:
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if api_key:
+                session.headers["Govee-API-Key"] = api_key
+            _sessions[api_key] = session
+        return session
+
+
+# Helper: send pushcut notification, returning True if it was delivered. The
+# outcome goes to the EventLog if one is passed, and is printed otherwise.
+def send_pushcut_notification(pushcut_url, title, text, events=None):
     if not pushcut_url:
-        print("Pushcut URL is missing; cannot send notification.")
-        return
+        log_event(events, WARNING, "notification", "Pushcut URL is missing; cannot send notification.",
+                  title=title, delivered=False)
+        return False
 
     message = {
         "title": title,
@@ -16,63 +63,312 @@ def send_pushcut_notification(pushcut_url, title, text):
     }
 
     try:
-        response = requests.post(pushcut_url, json=message)
+        response = http_session().post(pushcut_url, json=message, timeout=10)
         if response.ok:
-            print("Pushcut notification sent successfully.")
-        else:
-            print(f"Failed to send Pushcut notification: {response.status_code}")
-            print(response.text)
+            log_event(events, INFO, "notification", "Pushcut notification sent successfully.", title=title,
+                      delivered=True)
+            return True
+        log_event(events, WARNING, "notification",
+                  f"Failed to send Pushcut notification: {response.status_code}\n{response.text}", title=title,
+                  status=response.status_code, delivered=False)
     except Exception as e:
-        print(f"Error sending Pushcut notification: {e}")
+        log_event(events, WARNING, "notification", f"Error sending Pushcut notification: {e}", title=title,
+                  error=str(e), delivered=False)
+    return False
 
 
-# Check plug state helper
-def check_plug_state(plug, headers, send_notifications, pushcut_url):
-    name = plug.get("name")
-    device_id = plug.get("device_id")
-    model = plug.get("model")
-    expected_power = plug.get("expected_power", "ignore")
-    monitor_responsive = plug.get("monitor_responsive", True)
+# Check plug state helper for one compiled Plug record (see plugs.py). Every
+# poll is passed to each of `recorders` (HistoryStore, Metrics, StatusBoard)
+# whatever the outcome, and its raw response to `recording` for replay.
+# Optional helpers: `notifier` queues alerts, `policy` retries the request and
+# skips it while the circuit is open, `events` receives messages (printed
+# otherwise). Returns True if the plug failed its check, False if it passed,
+# or None if the poll was throttled and says nothing about the plug.
+def check_plug_state(plug, session, send_notifications, recorders=(), notifier=None, policy=None, recording=None,
+                     events=None):
+    name = plug.name
+    device_id = plug.device_id
+    expected_power = plug.expected_power
+    monitor_responsive = plug.monitor_responsive
+    pushcut_url = plug.pushcut_url
+
+    def alert(state_key, title, text):
+        if not (send_notifications and pushcut_url):
+            return
+        if notifier is not None:
+            notifier.notify(pushcut_url, device_id, state_key, title, text)
+        else:
+            send_pushcut_notification(pushcut_url, title, text)
 
-    url = "https://developer-api.govee.com/v1/devices/state"
+    url = plug.state_url
+    breaker = policy.breaker(device_id) if policy is not None else None
+    status = online = state = latency = response = error = mode = None
+    started = time.time()
     try:
-        response = requests.get(url, headers=headers, params={"device": device_id, "model": model}, timeout=10)
+        mode = breaker.before_request(time.monotonic()) if breaker is not None else None
+        if mode == OPEN:
+            log_event(events, WARNING, "unresponsive",
+                      f"{name} is unresponsive (circuit open after repeated timeouts; next probe in "
+                      f"{max(0, breaker.opened_at + breaker.cooldown - time.monotonic()):.0f}s)",
+                      device=device_id, name=name, circuit=OPEN)
+            return monitor_responsive
+
+        if policy is None:
+            response = session.get(url, timeout=10)
+        else:
+            response = policy.call(lambda timeout: session.get(url, timeout=timeout),
+                                   probe=mode == HALF_OPEN)
+        latency = time.time() - started
+        status = response.status_code
+        if breaker is not None:
+            if mode == HALF_OPEN:
+                log_event(events, INFO, "circuit", f"{name} answered a probe; closing its circuit breaker",
+                          device=device_id, name=name)
+            breaker.record_success()
+
+        if response.status_code == 429:
+            # Throttling says nothing about the device, so report no result rather than a failure
+            log_event(events, INFO, "throttled",
+                      f"{name} check throttled by the Govee API (HTTP 429); skipping this poll",
+                      device=device_id, name=name)
+            return None
 
         if response.status_code != 200:
             if monitor_responsive:
-                print(f"{name} is unresponsive (HTTP {response.status_code})")
-                if send_notifications and pushcut_url:
-                    send_pushcut_notification(pushcut_url, "Govee Plug Alert", f"{name} is unresponsive.")
+                log_event(events, WARNING, "unresponsive", f"{name} is unresponsive (HTTP {response.status_code})",
+                          device=device_id, name=name, status=response.status_code)
+                alert("unresponsive", "Govee Plug Alert", f"{name} is unresponsive.")
                 return True
             return False
 
         data = response.json()
-        state = data.get("data", {}).get("properties", [{}])[0].get("value")
+        props = {p: v for d in data.get("data", {}).get("properties", []) for p, v in d.items()}
+        online = props.get("online")
+        state = props.get("powerState")
 
         if expected_power != "ignore" and state != expected_power:
-            print(f"{name} is in wrong power state (expected {expected_power}, got {state})")
-            if send_notifications and pushcut_url:
-                send_pushcut_notification(
-                    pushcut_url,
-                    "Govee Power State Alert",
-                    f"{name} is {state.upper()} but expected {expected_power.upper()}"
-                )
+            log_event(events, WARNING, "mismatch",
+                      f"{name} is in wrong power state (expected {expected_power}, got {state})",
+                      device=device_id, name=name, expected=expected_power, power=state)
+            alert(
+                f"power:{state}",
+                "Govee Power State Alert",
+                f"{name} is {str(state).upper()} but expected {expected_power.upper()}"
+            )
             return True
 
     except Exception as e:
-        print(f"Error checking {name}: {e}")
+        error = str(e) or type(e).__name__
+        log_event(events, WARNING, "unresponsive", f"Error checking {name}: {e}", device=device_id, name=name,
+                  error=error)
+        if breaker is not None:
+            breaker.record_failure(time.monotonic())
         return True
-
+    finally:
+        # A poll skipped while the circuit is open made no request and has no latency
+        if latency is None and mode != OPEN:
+            latency = time.time() - started
+        for recorder in recorders:
+            recorder.record(device_id, started, status, online, state, latency, name=name)
+        if events is not None and events.wants(DEBUG):
+            latency_ms = None if latency is None else round(latency * 1000)
+            events.emit(DEBUG, "poll", f"{name}: HTTP {status}, online={online}, power={state}, {latency_ms}ms",
+                        device=device_id, name=name, status=status, online=online, power=state,
+                        latency_ms=latency_ms, error=error)
+        if recording is not None and (response is not None or error is not None):
+            recording.record(device_id, started, status, latency, response.text if response is not None else None,
+                             error)
+
+    if notifier is not None:
+        notifier.resolve(device_id)
     return False
 
 
+# Send a message to the event log, or print it when there is none (one-off
+# commands, replay)
+def log_event(events, level, kind, message, **fields):
+    if events is None:
+        print(message)
+    else:
+        events.emit(level, kind, message, **fields)
+
+
+# Fetch the state of one device, returning the exception instead of raising so
+# that a single bad device doesn't abort a concurrent sweep
+def fetch_device_state(device_id, model, session):
+    try:
+        return session.get(GOVEE_STATE_URL, params={"device": device_id, "model": model}, timeout=10)
+    except Exception as e:
+        return e
+
+
+# Fetch state for many devices at once, up to `concurrency` requests in flight.
+# Results are returned in the same order as `devices`. If given, progress(done,
+# total) is called from the calling thread as each request completes.
+def fetch_device_states(devices, session, concurrency=DEFAULT_CONCURRENCY, progress=None):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    if not devices:
+        return []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(devices))) as pool:
+        futures = [pool.submit(fetch_device_state, d.get("device"), d.get("model"), session) for d in devices]
+        if progress is not None:
+            for done, _ in enumerate(as_completed(futures), 1):
+                progress(done, len(futures))
+        return [future.result() for future in futures]
+
+
+# Merge a state response's properties list into one dict, or None if the
+# request failed or didn't return usable JSON
+def parse_state_properties(state_response):
+    if isinstance(state_response, Exception):
+        return None
+    try:
+        state_data = state_response.json().get("data", {})
+    except ValueError:
+        return None
+    return {p: v for d in state_data.get("properties", []) for p, v in d.items()}
+
+
+# Read the on-disk device catalog, ignoring it if it belongs to another API key
+def read_device_cache(api_key):
+    import hashlib
+    try:
+        with open(state_path(DEVICE_CACHE_FILE)) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("key") != hashlib.sha256(api_key.encode()).hexdigest():
+        return None
+    return cache
+
+
+# Fetch /v1/devices and rewrite the catalog. If the cache has validators, the
+# request is conditional and a 304 only bumps the cache timestamp.
+def refresh_device_cache(session, api_key, cache=None):
+    import hashlib
+    headers = {}
+    if cache and cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache and cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    response = session.get(GOVEE_DEVICES_URL, headers=headers, timeout=10)
+    if response.status_code == 304 and cache:
+        devices = cache["devices"]
+    else:
+        response.raise_for_status()
+        devices = response.json().get("data", {}).get("devices", [])
+    cache = {
+        "key": hashlib.sha256(api_key.encode()).hexdigest(),
+        "fetched_at": time.time(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "devices": devices,
+    }
+    # Write to a temp file and rename so concurrent readers never see a partial catalog
+    cache_path = state_path(DEVICE_CACHE_FILE)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+    return cache
+
+
+def _refresh_device_cache_quietly(session, api_key, cache):
+    try:
+        refresh_device_cache(session, api_key, cache)
+    except Exception as e:
+        print(f"Background refresh of the device list failed: {e}", file=sys.stderr)
+
+
+# Get the account's device list, served from the on-disk catalog when it is
+# younger than ttl. Past half the ttl the cached list is still returned, but a
+# background refresh is started so the next caller gets fresh data without
+# waiting. If the API is unreachable, a stale catalog is better than nothing.
+# Warnings go to stderr so `check --format json` output stays parseable.
+def get_devices(session, api_key, ttl=DEFAULT_DEVICE_CACHE_TTL, refresh=False):
+    cache = read_device_cache(api_key)
+    age = time.time() - cache["fetched_at"] if cache else None
+    if cache and not refresh and age < ttl:
+        if age >= ttl / 2:
+            threading.Thread(target=_refresh_device_cache_quietly, args=(session, api_key, cache)).start()
+        return cache["devices"]
+    try:
+        return refresh_device_cache(session, api_key, cache)["devices"]
+    except Exception as e:
+        if not cache:
+            raise
+        print(f"Could not refresh the device list ({e}); using cached list from {time.ctime(cache['fetched_at'])}",
+              file=sys.stderr)
+        return cache["devices"]
+
+
+# Run check_plug_state for every plug concurrently and gather one sweep result:
+# a list of (plug, failed) pairs in config order. If spread is set, request
+# starts are paced evenly over that many seconds instead of bursting, so the
+# sweep takes about `spread` seconds plus the last device's latency. Without
+# it, wall time is bounded by the slowest device rather than the sum of all.
+# Keyword arguments are passed on to check_plug_state.
+def poll_plugs(plugs, session, send_notifications, executor, spread=0, **kwargs):
+    def check(plug):
+        return plug, check_plug_state(plug, session, send_notifications, **kwargs)
+
+    futures = []
+    start = time.monotonic()
+    for i, plug in enumerate(plugs):
+        if spread:
+            delay = start + i * spread / len(plugs) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        futures.append(executor.submit(check, plug))
+    return [future.result() for future in futures]
+
+
+# Adaptive alternative to poll_plugs: for `window` seconds, poll plugs as the
+# AdaptiveScheduler says they are due, most overdue first, with at most
+# `concurrency` requests in flight. Returns (plug, failed) for every plug polled
+# during the window, so it slots into the same per-sweep evaluation.
+def poll_due_plugs(plugs, scheduler, session, send_notifications, executor, window, concurrency, **kwargs):
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    def check(index):
+        return index, check_plug_state(plugs[index], session, send_notifications, **kwargs)
+
+    concurrency = max(1, concurrency)
+    deadline = time.monotonic() + window
+    in_flight = set()
+    results = []
+    while True:
+        now = time.monotonic()
+        if now < deadline:
+            for index in scheduler.pop_due(now, concurrency - len(in_flight)):
+                in_flight.add(executor.submit(check, index))
+        elif not in_flight:
+            break
+        if now >= deadline or len(in_flight) >= concurrency:
+            # Nothing more can start until a poll finishes
+            timeout = None
+        else:
+            next_due = scheduler.next_due()
+            wake_at = deadline if next_due is None else min(deadline, next_due)
+            timeout = max(0, wake_at - time.monotonic())
+            if not in_flight:
+                # wait() returns at once on an empty set
+                time.sleep(timeout)
+                continue
+        done, in_flight = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, failed = future.result()
+            scheduler.report(index, failed, time.monotonic())
+            results.append((plugs[index], failed))
+    return results
+
+
 def test_pushcut():
     if not os.path.exists(CONFIG_FILE):
         print(f"No config found at {CONFIG_FILE}. Please run 'config' first.")
         return
 
-    with open(CONFIG_FILE) as f:
-        config = json.load(f)
+    config = load_config()
 
     pushcut_url = config.get("pushcut_url")
     if not pushcut_url:
@@ -83,9 +379,94 @@ def test_pushcut():
 
 
 CONFIG_FILE = "config.json"
+CONFIG_CACHE_FILE = "config.cache"
+DEVICE_CACHE_FILE = "devices_cache.json"
+CHECK_SNAPSHOT_FILE = "check_snapshot.json"
+
+# Config keys that must be non-negative numbers when present
+NUMERIC_CONFIG_KEYS = (
+    "interval", "concurrency", "rate_limit_per_minute", "device_cache_ttl", "min_interval", "max_interval",
+    "interval_backoff", "request_budget_per_minute", "history_retention_days", "metrics_port", "attempt_timeout",
+    "retries", "hedge_after", "probe_timeout", "breaker_threshold", "breaker_cooldown", "fail_window", "fail_quorum",
+    "alert_coalesce_window", "alert_repeat_interval", "alert_max_attempts", "log_file_max_bytes", "log_file_backups",
+)
+# Numeric keys used as counts, sizes or ports, which must also be whole numbers
+INTEGER_CONFIG_KEYS = (
+    "concurrency", "metrics_port", "retries", "breaker_threshold", "fail_window", "fail_quorum", "alert_max_attempts",
+    "log_file_max_bytes", "log_file_backups",
+)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+# Path for a state file (device cache, history) that belongs to the current
+# config. The default config.json uses the plain name; another config such as
+# accounts/home.json gets accounts/home.<name>, so accounts never share state.
+def state_path(filename):
+    if CONFIG_FILE == "config.json":
+        return filename
+    return f"{os.path.splitext(CONFIG_FILE)[0]}.{filename}"
+
+
+# Check the parts of a config the commands rely on, so a bad edit is reported
+# up front rather than as a KeyError or TypeError halfway through a sweep
+def validate_config(config):
+    if not isinstance(config, dict):
+        raise ConfigError("the config must be a JSON object")
+    plugs = config.get("plugs", [])
+    if not isinstance(plugs, list):
+        raise ConfigError("'plugs' must be a list")
+    for i, plug in enumerate(plugs, 1):
+        if not isinstance(plug, dict) or not plug.get("device_id"):
+            raise ConfigError(f"plug {i} has no 'device_id'")
+    for key in NUMERIC_CONFIG_KEYS:
+        value = config.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            raise ConfigError(f"'{key}' must be a non-negative number")
+    for key in INTEGER_CONFIG_KEYS:
+        value = config.get(key)
+        if value is not None and not isinstance(value, int):
+            raise ConfigError(f"'{key}' must be a whole number")
+    if config.get("log_level", "info") not in ("debug", "info", "warning", "error"):
+        raise ConfigError("'log_level' must be one of debug, info, warning or error")
+
+
+# Load and validate the current config file. The validated config is cached
+# next to it in marshal format, keyed by the file's path, mtime and size, so
+# commands run every few seconds from cron or health probes skip JSON parsing
+# and validation until the file changes.
+def load_config():
+    import marshal
+    stat = os.stat(CONFIG_FILE)
+    key = (os.path.abspath(CONFIG_FILE), stat.st_mtime_ns, stat.st_size)
+    cache_path = state_path(CONFIG_CACHE_FILE)
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, config = marshal.load(f)
+        if cached_key == key:
+            return config
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
 
+    try:
+        with open(CONFIG_FILE) as f:
+            config = json.load(f)
+    except ValueError as e:
+        raise ConfigError(f"invalid JSON: {e}")
+    validate_config(config)
+    try:
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump((key, config), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return config
 
-def write_config():
+
+def write_config(refresh_devices=False):
     print("Setting up Govee Plug Monitor Configuration\n")
     print("To use this tool, you need a Govee API key.")
     print("1. Visit https://developer.govee.com")
@@ -101,7 +482,9 @@ def write_config():
     default_api_key = existing_config.get("govee_api_key", "")
     user_input = input(f"Enter your Govee API key [{default_api_key}]: ").strip()
     api_key = user_input if user_input else default_api_key
-    headers = {"Govee-API-Key": api_key}
+    concurrency = existing_config.get("concurrency", DEFAULT_CONCURRENCY)
+    rate_limit = existing_config.get("rate_limit_per_minute", DEFAULT_RATE_LIMIT_PER_MINUTE)
+    session = http_session(api_key, pool_size=concurrency, rate_limit=rate_limit)
 
     existing_plugs = {
         p.get("device_id"): p for p in existing_config.get("plugs", []) if "device_id" in p
@@ -109,9 +492,8 @@ def write_config():
 
     # Fetch devices and check responsiveness immediately after API key input
     try:
-        response = requests.get("https://developer-api.govee.com/v1/devices", headers=headers)
-        response.raise_for_status()
-        devices = response.json().get("data", {}).get("devices", [])
+        devices = get_devices(session, api_key, existing_config.get("device_cache_ttl", DEFAULT_DEVICE_CACHE_TTL),
+                              refresh=refresh_devices)
         if not devices:
             print(
                 "No devices were found in your Govee account. Please ensure your account is linked to devices in the Govee app.")
@@ -120,25 +502,22 @@ def write_config():
         print(f"Error fetching devices with provided API key: {e}")
         return
 
-    # Check responsiveness for all devices
+    # Probe every device once, concurrently; the same result is used both for
+    # responsiveness and for the observed power state shown later
+    def show_progress(done, total):
+        print(f"\rProbing devices... {done}/{total}", end="", flush=True)
+
+    state_responses = fetch_device_states(devices, session, concurrency, progress=show_progress)
+    print()
+    device_props = {}
     device_status_map = {}
     responsive_devices = []
     unresponsive_devices = []
-    for device in devices:
+    for device, state_response in zip(devices, state_responses):
         device_id = device.get("device")
-        model = device.get("model")
-        try:
-            state_response = requests.get(
-                "https://developer-api.govee.com/v1/devices/state",
-                headers=headers,
-                params={"device": device_id, "model": model},
-                timeout=10
-            )
-            state_data = state_response.json().get("data", {})
-            props = {p: v for d in state_data.get("properties", []) for p, v in d.items()}
-            online_status = props.get("online", True)
-        except Exception:
-            online_status = False
+        props = parse_state_properties(state_response)
+        device_props[device_id] = props or {}
+        online_status = False if props is None else props.get("online", True)
         device_status_map[device_id] = online_status
         if online_status is False:
             unresponsive_devices.append(device)
@@ -190,20 +569,9 @@ def write_config():
         model = device.get("model")
         device_id = device.get("device")
         existing = existing_plugs.get(device_id, {})
-        # Get current state for observed_power
-        try:
-            state_response = requests.get(
-                "https://developer-api.govee.com/v1/devices/state",
-                headers=headers,
-                params={"device": device_id, "model": model},
-                timeout=10
-            )
-            state_data = state_response.json().get("data", {})
-            props = {p: v for d in state_data.get("properties", []) for p, v in d.items()}
-            observed_power = props.get("powerState", "unknown")
-        except Exception:
-            props = {}
-            observed_power = "unknown"
+        # Current state for observed_power, from the probe above
+        props = device_props.get(device_id, {})
+        observed_power = props.get("powerState", "unknown")
         # Set expected_power
         if configure_expected_power:
             print(f"Expected power state for '{name}' (on/off/ignore) [default: ignore, current: {observed_power}]: ",
@@ -233,192 +601,815 @@ def write_config():
     if fail_mode not in {"any", "all"}:
         fail_mode = "any"
 
+    # Keep any other settings (rate limits, history, metrics...) from the existing config
     config = {
+        **existing_config,
         "govee_api_key": api_key,
         "pushcut_url": pushcut_url,
         "plugs": plugs,
         "interval": interval,
-        "fail_mode": fail_mode
+        "fail_mode": fail_mode,
+        "concurrency": concurrency
     }
-    with open(CONFIG_FILE, "w") as f:
+    # Write atomically so a running monitor never reloads a half-written file
+    tmp_path = f"{CONFIG_FILE}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(config, f, indent=2)
+    os.replace(tmp_path, CONFIG_FILE)
     print(f"\nConfiguration saved to {CONFIG_FILE}")
 
 
 def send_pushcut(url, title, message):
     try:
-        requests.post(url, json={"title": title, "text": message}, timeout=5)
+        return http_session().post(url, json={"title": title, "text": message}, timeout=5).ok
     except Exception as e:
         print(f"⚠️  Failed to send Pushcut notification: {e}")
+        return False
+
+
+# Build the background notification dispatcher from config settings
+def make_notifier(config, send, on_send=None, **kwargs):
+    from notify import (DEFAULT_COALESCE_WINDOW, DEFAULT_MAX_ATTEMPTS, DEFAULT_REPEAT_INTERVAL,
+                        NotificationDispatcher)
+    settings = {
+        "coalesce_window": config.get("alert_coalesce_window", DEFAULT_COALESCE_WINDOW),
+        "repeat_interval": config.get("alert_repeat_interval", DEFAULT_REPEAT_INTERVAL),
+        "max_attempts": config.get("alert_max_attempts", DEFAULT_MAX_ATTEMPTS),
+        "on_send": on_send,
+    }
+    return NotificationDispatcher(send, **{**settings, **kwargs})
+
+
+# Parse one device's state response into the flat record used for check output
+# and snapshots. `plug` is the device's monitored Plug record, if any.
+def check_device_record(device, state_response, plug):
+    name = device.get("deviceName")
+    record = {
+        "device_id": device.get("device"),
+        "name": name,
+        "model": device.get("model"),
+        "monitored": plug is not None,
+        "status": "responsive",
+        "online": None,
+        "power": None,
+        "properties": {},
+        "problem": None,
+    }
+    if isinstance(state_response, Exception):
+        record["status"] = "error"
+        record["message"] = f"- {name} error: {state_response}"
+    elif state_response.status_code == 429:
+        record["status"] = "throttled"
+        record["message"] = f"- {name} was not checked: throttled by the Govee API (HTTP 429)"
+        return record
+    elif state_response.status_code != 200:
+        record["status"] = "unresponsive"
+        record["message"] = f"- {name} is UNRESPONSIVE (status code {state_response.status_code})"
+    else:
+        props = parse_state_properties(state_response)
+        if props is None:
+            record["status"] = "error"
+            record["message"] = f"- {name} error: invalid state response"
+        else:
+            record["properties"] = props
+            record["online"] = props.get("online")
+            record["power"] = props.get("powerState")
+            if record["online"] is False:
+                record["status"] = "unresponsive"
+                record["message"] = f"- {name} is UNRESPONSIVE (online=False)"
+            else:
+                record["message"] = f"- {name} is responsive. State: {props}"
+
+    if plug is not None:
+        check_record_problem(record, plug)
+    return record
+
+
+# Set the problem of a monitored plug's check record, if it has one
+def check_record_problem(record, plug):
+    expected_power = plug.expected_power
+    if record["status"] != "responsive":
+        record["problem"] = "unresponsive"
+    elif expected_power != "ignore" and record["power"] != expected_power:
+        record["problem"] = f"power mismatch: expected {expected_power}, got {record['power']}"
+        record["message"] += f"\n- {record['name']} power mismatch: expected {expected_power}, got {record['power']}"
+
+
+# Build a plug's check record from a running monitor's status for it (see
+# status.py). The record also carries the monitor's view of the plug's health.
+def monitor_record(plug, state, now):
+    name = plug.name
+    record = {
+        "device_id": plug.device_id,
+        "name": name,
+        "model": plug.model,
+        "monitored": True,
+        "status": "responsive",
+        "online": None,
+        "power": None,
+        "properties": {},
+        "problem": None,
+    }
+    if state is None or state["checked_at"] is None:
+        record["status"] = "not_polled"
+        record["message"] = f"- {name} has not been polled by the monitor yet"
+        return record
+    record.update(checked_at=state["checked_at"], failures=state["failures"], alerting=state["alerting"],
+                  circuit=state["circuit"])
+    if state["status"] is None:
+        record["status"] = "unresponsive" if state["circuit"] == OPEN else "error"
+        reason = "circuit open after repeated timeouts" if state["circuit"] == OPEN else "request failed"
+        record["message"] = f"- {name} is UNRESPONSIVE ({reason})"
+    elif state["status"] != 200:
+        record["status"] = "unresponsive"
+        record["message"] = f"- {name} is UNRESPONSIVE (status code {state['status']})"
+    else:
+        record["online"] = state["online"]
+        record["power"] = state["power"]
+        record["properties"] = {k: v for k, v in (("online", state["online"]), ("powerState", state["power"]))
+                                if v is not None}
+        if state["online"] is False:
+            record["status"] = "unresponsive"
+            record["message"] = f"- {name} is UNRESPONSIVE (online=False)"
+        else:
+            record["message"] = f"- {name} is responsive. State: {record['properties']}"
+    record["message"] += f" (checked {max(0, now - state['checked_at']):.0f}s ago)"
+    check_record_problem(record, plug)
+    return record
+
+
+# Check records for the monitored plugs from a running monitor's status
+# socket, or None if no monitor is running or its last sweep is too old to trust
+def monitor_check_records(config, monitored, say):
+    from status import query_status
+    path = status_socket_path(config)
+    status = query_status(path) if path else None
+    if status is None:
+        return None
+    now = time.time()
+    updated_at = status.get("updated_at")
+    # Allow a couple of slow sweeps before deciding the monitor is stuck
+    if updated_at is None or now - updated_at > 3 * status.get("interval", 60) + 30:
+        say("The running monitor has no recent sweep; polling Govee directly.")
+        return None
+    say(f"Using device state from the running monitor (pid {status.get('pid')}, "
+        f"last sweep {now - updated_at:.0f}s ago).")
+    devices = status.get("devices", {})
+    return [monitor_record(plug, devices.get(plug.device_id), now) for plug in monitored]
+
+
+# Poll Govee for the check. Returns (records, devices that weren't polled), or
+# None if the account has no devices.
+def poll_check_records(config, monitored, monitored_only, refresh_devices, changes_only, say):
+    api_key = config.get("govee_api_key")
+    concurrency = config.get("concurrency", DEFAULT_CONCURRENCY)
+    rate_limit = config.get("rate_limit_per_minute", DEFAULT_RATE_LIMIT_PER_MINUTE)
+    session = http_session(api_key, pool_size=concurrency, rate_limit=rate_limit)
+
+    say("Fetching device list from Govee...")
+    devices = get_devices(session, api_key, config.get("device_cache_ttl", DEFAULT_DEVICE_CACHE_TTL),
+                          refresh=refresh_devices)
+    if not devices:
+        return None
+    if not changes_only:
+        say("\nAvailable Devices:")
+        for device in devices:
+            say(f"- Name: {device.get('deviceName')}, Model: {device.get('model')}, ID: {device.get('device')}")
+        # Show configured plugs
+        if monitored:
+            say("\nConfigured plugs to monitor:")
+            for plug in monitored:
+                say(f"- Name: {plug.name}, Pushcut URL: {plug.pushcut_url}")
+
+    say("\nChecking device states...")
+    polled_devices = devices
+    unpolled = []
+    if monitored_only:
+        # Only spend quota on configured plugs; everything else comes from the cached device list
+        polled_devices = [d for d in devices if d.get("device") in monitored]
+        unpolled = [d for d in devices if d.get("device") not in monitored]
+    state_responses = fetch_device_states(polled_devices, session, concurrency)
+    records = [
+        check_device_record(device, state_response, monitored.find(device.get("device")))
+        for device, state_response in zip(polled_devices, state_responses)
+    ]
+    return records, unpolled
+
+
+# The parts of a check record that count as a change between runs
+def check_record_key(record):
+    return record["status"], record["online"], record["power"], record["properties"]
+
+
+# Check every device once. If a monitor is running (and direct is not set),
+# the monitored plugs' latest state is taken from it instead of polling Govee.
+# With changes_only, only devices whose status, online flag, power state or
+# other properties differ from the previous run's snapshot are reported.
+# output_format is "text", "json" or "ndjson"; the machine formats print
+# nothing but the records.
+def check_config(send_notifications: bool = False, monitored_only: bool = None, refresh_devices: bool = False,
+                 changes_only: bool = False, output_format: str = "text", direct: bool = False):
+    from plugs import PlugTable
+    text = output_format == "text"
+
+    def say(*args, **kwargs):
+        if text:
+            print(*args, **kwargs)
 
-
-def check_config(send_notifications: bool = False):
     if not os.path.exists(CONFIG_FILE):
-        print(f"No config found at {CONFIG_FILE}. Please run 'config' first.")
+        print(f"No config found at {CONFIG_FILE}. Please run 'config' first.", file=sys.stdout if text else sys.stderr)
         return
 
-    with open(CONFIG_FILE) as f:
-        config = json.load(f)
+    config = load_config()
+    monitored = PlugTable.from_config(config, GOVEE_STATE_URL)
+    if monitored_only is None:
+        monitored_only = config.get("check_monitored_only", False)
 
-    api_key = config.get("govee_api_key")
-    headers = {"Govee-API-Key": api_key}
+    records = None if direct else monitor_check_records(config, monitored, say)
+    unpolled = []
+    if records is None:
+        try:
+            polled = poll_check_records(config, monitored, monitored_only, refresh_devices, changes_only, say)
+        except Exception as e:
+            print(f"Error accessing Govee API: {e}", file=sys.stdout if text else sys.stderr)
+            return
+        if polled is None:
+            print("No devices found. Is your API key correct?", file=sys.stdout if text else sys.stderr)
+            return
+        records, unpolled = polled
 
-    print("Fetching device list from Govee...")
+    # Compare against the previous run and save this one. Devices that weren't
+    # polled (or were throttled) keep their previous snapshot entry and are
+    # never reported as changed, since nothing new is known about them.
+    snapshot_path = state_path(CHECK_SNAPSHOT_FILE)
     try:
-        response = requests.get("https://developer-api.govee.com/v1/devices", headers=headers)
-        response.raise_for_status()
-        devices = response.json().get("data", {}).get("devices", [])
-        if not devices:
-            print("No devices found. Is your API key correct?")
-            return
-        print("\nAvailable Devices:")
-        for device in devices:
-            print(f"- Name: {device.get('deviceName')}, Model: {device.get('model')}, ID: {device.get('device')}")
-        # Show configured plugs
-        plugs = config.get("plugs", [])
-        if plugs:
-            print("\nConfigured plugs to monitor:")
-            for p in plugs:
-                print(f"- Name: {p.get('name')}, Pushcut URL: {p.get('pushcut_url')}")
-
-        # Enhancement: Check and display device states, responsiveness, and expected power state
-        print("\nChecking device states...")
-        # Get set of monitored device IDs from config, and build expected-power dict
-        monitored_ids = {p["device_id"] for p in config.get("plugs", [])}
-        monitored = {
-            p["device_id"]: {
-                "name": p.get("name", p["device_id"]),
-                "expected_power": p.get("expected_power", "ignore"),
-                "pushcut_url": p.get("pushcut_url", config.get("pushcut_url", "")),
-            }
-            for p in config.get("plugs", [])
-        }
-        any_monitored_offline = False
-        for device in devices:
-            device_id = device.get("device")
-            model = device.get("model")
-            try:
-                state_response = requests.get(
-                    "https://developer-api.govee.com/v1/devices/state",
-                    headers=headers,
-                    params={"device": device_id, "model": model},
-                    timeout=10
-                )
-                if state_response.status_code == 200:
-                    state_data = state_response.json().get("data", {})
-                    props = {p: v for d in state_data.get("properties", []) for p, v in d.items()}
-                    online_status = props.get("online")
-                    if online_status is False:
-                        print(f"- {device.get('deviceName')} is UNRESPONSIVE (online=False)")
-                        if device_id in monitored:
-                            any_monitored_offline = True
-                            if send_notifications and monitored[device_id].get("pushcut_url"):
-                                send_pushcut(
-                                    monitored[device_id]["pushcut_url"],
-                                    f"Govee Alert: {device.get('deviceName')}",
-                                    "Device is unresponsive or power state mismatch"
-                                )
-                    else:
-                        print(f"- {device.get('deviceName')} is responsive. State: {state_data.get('properties')}")
-                        # Check expected power state if monitored
-                        power_status = None
-                        for prop in state_data.get("properties", []):
-                            if "powerState" in prop:
-                                power_status = prop["powerState"]
-                                break
-                        if device_id in monitored:
-                            expected_power = monitored[device_id]["expected_power"]
-                            if expected_power != "ignore" and power_status != expected_power:
-                                print(
-                                    f"- {device.get('deviceName')} power mismatch: expected {expected_power}, got {power_status}")
-                                any_monitored_offline = True
-                                if send_notifications and monitored[device_id].get("pushcut_url"):
-                                    send_pushcut(
-                                        monitored[device_id]["pushcut_url"],
-                                        f"Govee Alert: {device.get('deviceName')}",
-                                        "Device is unresponsive or power state mismatch"
-                                    )
-                else:
-                    print(f"- {device.get('deviceName')} is UNRESPONSIVE (status code {state_response.status_code})")
-                    if device_id in monitored:
-                        any_monitored_offline = True
-                        if send_notifications and monitored[device_id].get("pushcut_url"):
-                            send_pushcut(
-                                monitored[device_id]["pushcut_url"],
-                                f"Govee Alert: {device.get('deviceName')}",
-                                "Device is unresponsive or power state mismatch"
-                            )
-            except Exception as e:
-                print(f"- {device.get('deviceName')} error: {e}")
-                if device_id in monitored:
-                    any_monitored_offline = True
-                    if send_notifications and monitored[device_id].get("pushcut_url"):
-                        send_pushcut(
-                            monitored[device_id]["pushcut_url"],
-                            f"Govee Alert: {device.get('deviceName')}",
-                            "Device is unresponsive or power state mismatch"
-                        )
-        if any_monitored_offline:
-            print("\nError: One or more monitored devices are unresponsive or have incorrect power state.")
-            exit(1)
-    except Exception as e:
-        print(f"Error accessing Govee API: {e}")
+        with open(snapshot_path) as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    snapshot = dict(previous)
+    for record in records:
+        if record["status"] in ("throttled", "not_polled"):
+            record["changed"] = False
+            continue
+        before = previous.get(record["device_id"])
+        record["changed"] = before is None or check_record_key(before) != check_record_key(record)
+        snapshot[record["device_id"]] = {k: v for k, v in record.items() if k not in ("message", "changed")}
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, snapshot_path)
+
+    reported = [r for r in records if r["changed"]] if changes_only else records
+    if text:
+        if not changes_only:
+            for device in unpolled:
+                print(f"- {device.get('deviceName')} is not monitored (state not polled)")
+        for record in reported:
+            print(record["message"])
+        if changes_only and not reported:
+            print("No changes since the last check.")
+    elif output_format == "ndjson":
+        for record in reported:
+            print(json.dumps({k: v for k, v in record.items() if k != "message"}))
+    else:
+        print(json.dumps({
+            "checked_at": time.time(),
+            "devices": [{k: v for k, v in record.items() if k != "message"} for record in reported],
+        }, indent=2))
+
+    problems = [r for r in records if r["problem"]]
+    if send_notifications and problems:
+        # Alerts from a one-off check are coalesced into a single notification per Pushcut URL
+        notifier = make_notifier(config, send_pushcut)
+        for record in problems:
+            notifier.notify(monitored.find(record["device_id"]).pushcut_url, record["device_id"], "check",
+                            f"Govee Alert: {record['name']}",
+                            f"{record['name']} is unresponsive or has a power state mismatch")
+        # Wait for the coalesced alert to go out before exiting
+        notifier.close()
+    if problems:
+        say("\nError: One or more monitored devices are unresponsive or have incorrect power state.")
+        exit(1)
+
+
+# Effective values of the config keys the monitor can't change while running,
+# with defaults applied, so adding a key with its default value isn't a change
+def restart_settings(config):
+    from events import DEFAULT_LOG_FILE_BACKUPS, DEFAULT_LOG_FILE_MAX_BYTES
+    from history import DEFAULT_HISTORY_FILE
+    from metrics import DEFAULT_METRICS_HOST
+    from status import DEFAULT_STATUS_SOCKET
+    journal = config.get("log_journal", False)
+    return {
+        "govee_api_key": config.get("govee_api_key"),
+        "concurrency": config.get("concurrency", DEFAULT_CONCURRENCY),
+        "rate_limit_per_minute": config.get("rate_limit_per_minute", DEFAULT_RATE_LIMIT_PER_MINUTE),
+        "history": config.get("history", True),
+        "history_file": config.get("history_file", state_path(DEFAULT_HISTORY_FILE)),
+        "metrics_port": config.get("metrics_port"),
+        "metrics_host": config.get("metrics_host", DEFAULT_METRICS_HOST),
+        "status_socket": config.get("status_socket", state_path(DEFAULT_STATUS_SOCKET)),
+        "log_console": config.get("log_console", not journal),
+        "log_file": config.get("log_file"),
+        "log_file_max_bytes": config.get("log_file_max_bytes", DEFAULT_LOG_FILE_MAX_BYTES),
+        "log_file_backups": config.get("log_file_backups", DEFAULT_LOG_FILE_BACKUPS),
+        "log_journal": journal,
+    }
+
+
+# Event log for the monitor with the sinks configured in config.json. level
+# (e.g. from --log-level) overrides "log_level".
+def make_event_log(config, level=None):
+    from events import (DEFAULT_LOG_FILE_BACKUPS, DEFAULT_LOG_FILE_MAX_BYTES, LEVELS, ConsoleSink, EventLog,
+                        JournalSink, NdjsonFileSink)
+    journal = config.get("log_journal", False)
+    sinks = []
+    # journald already shows native entries in `journalctl -u`, so the console copy is off by default
+    if config.get("log_console", not journal):
+        sinks.append(ConsoleSink())
+    if config.get("log_file"):
+        sinks.append(NdjsonFileSink(config["log_file"],
+                                    max_bytes=config.get("log_file_max_bytes", DEFAULT_LOG_FILE_MAX_BYTES),
+                                    backups=config.get("log_file_backups", DEFAULT_LOG_FILE_BACKUPS)))
+    if journal:
+        sinks.append(JournalSink())
+    return EventLog(sinks, level=LEVELS[level or config.get("log_level", "info")])
+
+
+# Where the monitor serves its status, or None if "status_socket" is false or
+# the platform has no Unix sockets
+def status_socket_path(config):
+    import socket
+    from status import DEFAULT_STATUS_SOCKET
+    path = config.get("status_socket", state_path(DEFAULT_STATUS_SOCKET))
+    return path if path and hasattr(socket, "AF_UNIX") else None
+
+
+# Re-read the config file if its mtime differs from `mtime`. Returns (config,
+# mtime), with config None when the file is unchanged or invalid, so a broken
+# edit leaves the running config in place until the file changes again.
+def reload_config(mtime, events=None):
+    try:
+        current = os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return None, mtime
+    if current == mtime:
+        return None, mtime
+    try:
+        return load_config(), current
+    except (OSError, ValueError) as e:
+        log_event(events, ERROR, "monitor", f"Could not load {CONFIG_FILE}: {e}")
+        return None, current
+
+
+# Adaptive scheduler for the monitored plugs, or None when adaptive_polling is off
+def make_scheduler(config, count, interval, rate_limit):
+    if not config.get("adaptive_polling", False):
+        return None
+    from scheduler import DEFAULT_BACKOFF, AdaptiveScheduler
+    return AdaptiveScheduler(
+        count, interval,
+        min_interval=config.get("min_interval", max(1, interval / 4)),
+        max_interval=config.get("max_interval", interval * 10),
+        now=time.monotonic(),
+        backoff=config.get("interval_backoff", DEFAULT_BACKOFF),
+        budget_per_minute=config.get("request_budget_per_minute", rate_limit),
+    )
+
+
+# Feed one sweep's (plug, failed) results to the evaluator. Returns the plugs
+# that should alert now and the new fleet_alerted flag, which in fail_mode
+# "all" makes the fleet-wide alert fire once per outage.
+def sweep_alerts(results, evaluator, fail_mode, plugs, fleet_alerted):
+    from evaluator import TRIPPED
+    tripped = [plug for plug, failed in results if evaluator.observe(plug.device_id, failed) == TRIPPED]
+    if fail_mode == "all":
+        # Only alert when every plug has crossed its threshold
+        if evaluator.all_tripped(len(plugs)):
+            return ([] if fleet_alerted else list(plugs)), True
+        return [], False
+    return tripped, fleet_alerted
+
+
+def threshold_alert(plug, evaluator, notifier, now, events=None):
+    message = f"ALERT - {plug.name} failed {evaluator.failures(plug.device_id)} of its last {evaluator.window} checks."
+    if events is None:
+        print(f"{time.ctime(now)}: {message}")
+    else:
+        events.emit(ERROR, "alert", message, device=plug.device_id, name=plug.name,
+                    failures=evaluator.failures(plug.device_id), window=evaluator.window)
+    notifier.notify(plug.pushcut_url, plug.device_id, "threshold", "Govee Plug Alert",
+                    f"{plug.name} is unresponsive or failed power check.")
 
 
-def run_monitor(fail_mode="any"):
+# Run the monitoring loop forever, or for max_sweeps sweeps if given
+def run_monitor(fail_mode="any", concurrency=None, max_sweeps=None, metrics_port=None, record=None,
+                log_level=None):
     if not os.path.exists(CONFIG_FILE):
         print(f"No config found at {CONFIG_FILE}. Please run 'config' first.")
         return
 
-    with open(CONFIG_FILE) as f:
-        config = json.load(f)
+    config, config_mtime = reload_config(None)
+    if config is None:
+        return
+
+    # Everything the loop reports goes through the event log, which writes to
+    # its sinks from a background thread
+    from events import LEVELS
+    events = make_event_log(config, log_level)
 
+    from concurrent.futures import ThreadPoolExecutor
+    from plugs import PlugTable
     api_key = config.get("govee_api_key")
-    monitored_plugs = config.get("plugs", [])
-    headers = {"Govee-API-Key": api_key}
+    monitored_plugs = PlugTable.from_config(config, GOVEE_STATE_URL)
 
-    # Load interval and fail_mode from config if available
+    # Load interval, fail_mode, concurrency and rate limiting from config if available
+    default_fail_mode = fail_mode
     interval = config.get("interval", 60)
-    fail_mode = config.get("fail_mode", fail_mode)
+    fail_mode = config.get("fail_mode", default_fail_mode)
+    concurrency = concurrency or config.get("concurrency", DEFAULT_CONCURRENCY)
+    rate_limit = config.get("rate_limit_per_minute", DEFAULT_RATE_LIMIT_PER_MINUTE)
+    spread = interval if config.get("spread_polls", True) else 0
+    scheduler = make_scheduler(config, len(monitored_plugs), interval, rate_limit)
+
+    history = None
+    if config.get("history", True):
+        from history import DEFAULT_HISTORY_FILE, DEFAULT_RAW_RETENTION_DAYS, HistoryStore
+        history = HistoryStore(config.get("history_file", state_path(DEFAULT_HISTORY_FILE)))
+        retention_days = config.get("history_retention_days", DEFAULT_RAW_RETENTION_DAYS)
+
+    metrics = None
+    metrics_port = metrics_port or config.get("metrics_port")
+    if metrics_port:
+        from metrics import DEFAULT_METRICS_HOST, Metrics
+        metrics = Metrics()
+        metrics_host = config.get("metrics_host", DEFAULT_METRICS_HOST)
+        metrics.serve(metrics_port, metrics_host)
+        events.emit(INFO, "monitor", f"Serving Prometheus metrics on http://{metrics_host}:{metrics_port}/metrics")
+
+    # Retries, hedging and per-device circuit breakers for state requests
+    policy = RequestPolicy.from_config(config)
+
+    recorder = None
+    if record:
+        from recording import Recorder
+        recorder = Recorder(record)
+        events.emit(INFO, "monitor", f"Recording raw state responses to {record}")
+
+    # Pushcut alerts are delivered from a background queue so the sweep never waits on them
+    notifier = make_notifier(config, lambda url, title, text: send_pushcut_notification(url, title, text, events),
+                             metrics.observe_notification if metrics else None, events=events)
+
+    # Latest state per device, served to `check` and other local tools over a Unix socket
+    board = None
+    socket_path = status_socket_path(config)
+    if socket_path:
+        from status import StatusBoard
+        board = StatusBoard(interval)
+        if board.serve(socket_path):
+            events.emit(INFO, "monitor", f"Serving device status on {socket_path}")
+        else:
+            events.emit(WARNING, "monitor",
+                        f"Another monitor is already serving status on {socket_path}; not serving status.")
+            board = None
+
+    # List monitored devices at start
+    events.emit(INFO, "monitor", f"Beginning monitoring of {len(monitored_plugs)} devices:" +
+                "".join(f"\n - {plug.name} ({plug.device_id})" for plug in monitored_plugs),
+                devices=len(monitored_plugs))
+
+    # Each plug alerts when fail_quorum of its last fail_window polls failed
+    from evaluator import DEFAULT_FAIL_WINDOW, FailureEvaluator
+    from notify import DEFAULT_COALESCE_WINDOW, DEFAULT_MAX_ATTEMPTS, DEFAULT_REPEAT_INTERVAL
+    evaluator = FailureEvaluator(config.get("fail_window", DEFAULT_FAIL_WINDOW), config.get("fail_quorum"))
+    fleet_alerted = False
+
+    events.emit(INFO, "monitor", f"Monitoring all configured plugs every {interval} seconds with fail mode "
+                f"'{fail_mode}' ({concurrency} concurrent requests)...", interval=interval, fail_mode=fail_mode,
+                concurrency=concurrency)
+
+    # Passed to check_plug_state for every poll
+    observers = {
+        "recorders": [r for r in (history, metrics, board) if r is not None],
+        "notifier": notifier,
+        "policy": policy,
+        "recording": recorder,
+        "events": events,
+    }
 
-    # Print monitored devices at start
-    print(f"{time.ctime()}: Beginning monitoring of {len(monitored_plugs)} devices:")
-    for plug in monitored_plugs:
-        print(f" - {plug.get('name')} ({plug.get('device_id')})")
+    session = http_session(api_key, pool_size=concurrency, rate_limit=rate_limit)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    next_sweep = time.monotonic()
+    next_compaction = 0
+    sweeps = 0
 
-    fail_count = 0
-    threshold = 3
+    # systemctl stop/restart and the supervisor send SIGTERM. Treat it like
+    # Ctrl-C so queued alerts and events are flushed and the status socket is
+    # removed; a second SIGTERM is ignored so it can't cut the cleanup short.
+    import signal
 
-    print(f"Monitoring all configured plugs every {interval} seconds with fail mode '{fail_mode}'...")
+    def stop(signum, frame):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
 
-    while True:
-        try:
-            failure = False
-            for plug in monitored_plugs:
-                plug_pushcut_url = plug.get("pushcut_url", config.get("pushcut_url", ""))
-                if check_plug_state(plug, headers, True, plug_pushcut_url):
-                    failure = True
-
-            # Print check completion message at the end of the monitoring loop, before sleep
-            print(f"{time.ctime()}: Check complete for all devices. Run marked successful.\n")
-
-            should_alert = (failure if fail_mode == "any" else failure)
-            if should_alert:
-                fail_count += 1
-                if fail_count >= threshold:
-                    print(f"{time.ctime()}: ALERT - Failure condition met for {threshold * interval} seconds.")
-                    for plug in monitored_plugs:
-                        pushcut_url = plug.get("pushcut_url", config.get("pushcut_url", ""))
-                        send_pushcut_notification(pushcut_url, "Govee Plug Alert",
-                                                  f"{plug.get('name')} is unresponsive or failed power check.")
-                    fail_count = 0
+    previous_sigterm = None
+    if threading.current_thread() is threading.main_thread():
+        previous_sigterm = signal.signal(signal.SIGTERM, stop)
+    try:
+        while max_sweeps is None or sweeps < max_sweeps:
+            # Apply config edits between sweeps. Plugs are matched by device ID,
+            # so unchanged plugs keep their schedule, breaker and failure window.
+            new_config, config_mtime = reload_config(config_mtime, events)
+            if new_config is not None and new_config != config:
+                current_settings = restart_settings(config)
+                for key, value in restart_settings(new_config).items():
+                    if value != current_settings[key]:
+                        events.emit(WARNING, "monitor",
+                                    f"'{key}' changed in {CONFIG_FILE}; restart the monitor to apply it.", key=key)
+                new_plugs = PlugTable.from_config(new_config, GOVEE_STATE_URL)
+                for plug in monitored_plugs:
+                    if plug.device_id not in new_plugs:
+                        evaluator.forget(plug.device_id)
+                        policy.forget(plug.device_id)
+                        if board is not None:
+                            board.forget(plug.device_id)
+                        if metrics is not None:
+                            metrics.forget(plug.device_id)
+                        events.emit(INFO, "monitor", f"Stopped monitoring {plug.name} ({plug.device_id})",
+                                    device=plug.device_id, name=plug.name)
+                for plug in new_plugs:
+                    if plug.device_id not in monitored_plugs:
+                        events.emit(INFO, "monitor", f"Started monitoring {plug.name} ({plug.device_id})",
+                                    device=plug.device_id, name=plug.name)
+
+                new_interval = new_config.get("interval", 60)
+                scheduler_keys = ("adaptive_polling", "min_interval", "max_interval", "interval_backoff",
+                                  "request_budget_per_minute")
+                if new_interval != interval or any(new_config.get(k) != config.get(k) for k in scheduler_keys):
+                    scheduler = make_scheduler(new_config, len(new_plugs), new_interval, rate_limit)
+                    # Start the new interval from now
+                    next_sweep = time.monotonic()
+                elif scheduler is not None and new_config.get("plugs") != config.get("plugs"):
+                    mapping = {i: new_plugs.indexes[device_id] for device_id, i in monitored_plugs.indexes.items()
+                               if device_id in new_plugs}
+                    scheduler.reindex(mapping, len(new_plugs), time.monotonic())
+
+                if (new_config.get("fail_window"), new_config.get("fail_quorum")) != \
+                        (config.get("fail_window"), config.get("fail_quorum")):
+                    # Failure windows of a different size can't be carried over
+                    evaluator = FailureEvaluator(new_config.get("fail_window", DEFAULT_FAIL_WINDOW),
+                                                 new_config.get("fail_quorum"))
+                    fleet_alerted = False
+                policy.reconfigure(new_config)
+                if history is not None:
+                    retention_days = new_config.get("history_retention_days", DEFAULT_RAW_RETENTION_DAYS)
+                notifier.coalesce_window = new_config.get("alert_coalesce_window", DEFAULT_COALESCE_WINDOW)
+                notifier.repeat_interval = new_config.get("alert_repeat_interval", DEFAULT_REPEAT_INTERVAL)
+                notifier.max_attempts = new_config.get("alert_max_attempts", DEFAULT_MAX_ATTEMPTS)
+                if not log_level:
+                    events.level = LEVELS[new_config.get("log_level", "info")]
+
+                config = new_config
+                monitored_plugs = new_plugs
+                interval = new_interval
+                fail_mode = config.get("fail_mode", default_fail_mode)
+                spread = interval if config.get("spread_polls", True) else 0
+                events.emit(INFO, "monitor", f"Reloaded {CONFIG_FILE}; monitoring {len(monitored_plugs)} devices "
+                            f"every {interval} seconds with fail mode '{fail_mode}'.")
+
+            sweeps += 1
+            # Sweeps start on a fixed schedule, so spreading polls across the
+            # interval doesn't stretch the time between sweeps
+            next_sweep += interval
+            try:
+                throttled_before = session.rate_limiter.throttled
+                sweep_started = time.monotonic()
+                # Time the sweep deliberately spends spreading poll starts, so
+                # the sweep metric can leave it out
+                paced = spread * (len(monitored_plugs) - 1) / len(monitored_plugs) if monitored_plugs else 0
+                # Polls don't alert on their own; threshold_alert below is the only alert path
+                if scheduler is not None:
+                    # Each "sweep" is one interval's worth of whichever plugs came due
+                    paced = max(0, next_sweep - time.monotonic())
+                    results = poll_due_plugs(monitored_plugs, scheduler, session, False, executor, paced, concurrency,
+                                             **observers)
+                else:
+                    results = poll_plugs(monitored_plugs, session, False, executor, spread=spread, **observers)
+                sweep_seconds = time.monotonic() - sweep_started
+                if recorder is not None:
+                    recorder.flush()
+                if history is not None:
+                    history.flush()
+                    if time.monotonic() >= next_compaction:
+                        history.compact(retention_days)
+                        next_compaction = time.monotonic() + 86400
+
+                # Report check completion at the end of the monitoring loop, before sleep
+                throttled = session.rate_limiter.throttled - throttled_before
+                if throttled:
+                    events.emit(WARNING, "throttled",
+                                f"{throttled} requests were throttled by the Govee API this sweep.", count=throttled)
+                if scheduler is not None:
+                    events.emit(INFO, "sweep", f"Made {len(results)} polls this interval; projected "
+                                f"{scheduler.requests_per_minute():.1f} requests/minute.",
+                                requests_per_minute=round(scheduler.requests_per_minute(), 1))
+
+                tripped, fleet_alerted = sweep_alerts(results, evaluator, fail_mode, monitored_plugs, fleet_alerted)
+                events.emit(INFO, "sweep", "Check complete for all devices. Run marked successful.", sweep=sweeps,
+                            polls=len(results), failed=sum(1 for _, failed in results if failed),
+                            alerting=len(evaluator.tripped), throttled=throttled, seconds=round(sweep_seconds, 3))
+                for plug in tripped:
+                    threshold_alert(plug, evaluator, notifier, time.time(), events)
+                if board is not None:
+                    for plug, _ in results:
+                        breaker = policy.breakers.get(plug.device_id)
+                        board.update_health(plug.device_id, evaluator.failures(plug.device_id),
+                                            plug.device_id in evaluator.tripped, breaker.state if breaker else None)
+                    board.sweep_done(interval)
+                if metrics is not None:
+                    metrics.observe_sweep(sweep_seconds, len(evaluator.tripped), paced)
+            except Exception as e:
+                events.emit(ERROR, "monitor", f"Error during monitoring loop: {e}", error=str(e))
+            if sweeps == max_sweeps:
+                break
+            delay = next_sweep - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
             else:
-                fail_count = 0
+                # The sweep overran the interval; start the next one now rather than trying to catch up
+                next_sweep = time.monotonic()
+    except KeyboardInterrupt:
+        events.emit(INFO, "monitor", "Stopping monitor.")
+    finally:
+        notifier.close(timeout=10)
+        if history is not None:
+            history.close()
+        if recorder is not None:
+            recorder.close()
+        if board is not None:
+            board.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        events.close()
+        if previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+
+
+# Replay a recording made with `run --record` through check_plug_state, the
+# failure evaluator and the notification dispatcher, using the current config's
+# plugs, thresholds and alert settings, with no network. Sweeps run every
+# `interval` seconds of recorded time (default: the config's interval); each
+# plug with a poll recorded since its last sweep is checked against the most
+# recent one. Notifications are counted rather than sent.
+def replay_recording(path, interval=None, fail_mode=None, verbose=False):
+    import contextlib
+    from evaluator import DEFAULT_FAIL_WINDOW, FailureEvaluator
+    from plugs import PlugTable
+    from recording import ReplayResponse, ReplaySession, read_recording
+
+    if not os.path.exists(path):
+        print(f"No recording found at {path}.")
+        return
+    config = load_config() if os.path.exists(CONFIG_FILE) else {}
+    plugs = PlugTable.from_config(config, GOVEE_STATE_URL)
+    if not plugs:
+        print(f"No plugs configured in {CONFIG_FILE}; nothing to replay.")
+        return
 
-            time.sleep(interval)
-        except Exception as e:
-            print(f"{time.ctime()}: Error during monitoring loop: {e}")
-            time.sleep(interval)
+    interval = interval or config.get("interval", 60)
+    fail_mode = fail_mode or config.get("fail_mode", "any")
+    evaluator = FailureEvaluator(config.get("fail_window", DEFAULT_FAIL_WINDOW), config.get("fail_quorum"))
+    # Alerts are deduplicated on recorded time, and delivered instantly to a no-op sender
+    clock = [0.0]
+    notifier = make_notifier(config, lambda url, title, text: True, coalesce_window=0, clock=lambda: clock[0])
+    session = ReplaySession()
+    responses = {}
+    latest = {}
+    fleet_alerted = False
+    polls = sweeps = alerts = 0
+    first = next_sweep = timestamp = None
+    # Per-poll output is only shown with verbose; alerts are always shown
+    devnull = open(os.devnull, "w")
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull)
+    started = time.perf_counter()
+
+    def sweep(now):
+        nonlocal fleet_alerted, polls, sweeps, alerts
+        clock[0] = now
+        results = []
+        with quiet:
+            for index, response in latest.items():
+                plug = plugs[index]
+                session.responses[plug.state_url] = response
+                results.append((plug, check_plug_state(plug, session, False, notifier=notifier)))
+        latest.clear()
+        tripped, fleet_alerted = sweep_alerts(results, evaluator, fail_mode, plugs, fleet_alerted)
+        for plug in tripped:
+            threshold_alert(plug, evaluator, notifier, now)
+        polls += len(results)
+        sweeps += 1
+        alerts += len(tripped)
+
+    for timestamp, device_id, status, latency, body, error in read_recording(path):
+        index = plugs.indexes.get(device_id)
+        if index is None:
+            continue
+        if first is None:
+            first = timestamp
+            next_sweep = timestamp + interval
+        if timestamp >= next_sweep:
+            if latest:
+                sweep(next_sweep)
+            # Skip over gaps in the recording (e.g. the monitor was stopped)
+            next_sweep += ((timestamp - next_sweep) // interval + 1) * interval
+        if error is not None:
+            latest[index] = Exception(error)
+        else:
+            response = responses.get((status, body))
+            if response is None:
+                response = responses[(status, body)] = ReplayResponse(status, body)
+            latest[index] = response
+    if latest:
+        sweep(next_sweep)
+    notifier.close()
+    devnull.close()
+
+    if first is None:
+        print(f"The recording has no polls for the plugs in {CONFIG_FILE}.")
+        return
+    elapsed = time.perf_counter() - started
+    span = timestamp - first
+    print(f"\nReplayed {polls} polls in {sweeps} sweeps covering {span / 3600:.1f} hours of recorded time "
+          f"in {elapsed:.2f}s ({span / elapsed if elapsed else 0:.0f}x real time).")
+    print(f"Interval {interval}s, fail mode '{fail_mode}', {evaluator.quorum} of {evaluator.window} polls to alert: "
+          f"{alerts} threshold alerts, {notifier.sent} notifications sent, {notifier.suppressed} duplicates suppressed.")
+
+
+# Parse a --since/--until value: a relative age like 90m, 24h or 7d, or an ISO date/time
+def parse_time_arg(value, now):
+    from datetime import datetime
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if value[:-1].isdigit() and value[-1] in units:
+        return now - int(value[:-1]) * units[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def show_history(since="24h", until=None, device=None):
+    from history import DEFAULT_HISTORY_FILE, HistoryStore
+
+    config = load_config() if os.path.exists(CONFIG_FILE) else {}
+    history_file = config.get("history_file", state_path(DEFAULT_HISTORY_FILE))
+    if not os.path.exists(history_file):
+        print(f"No history found at {history_file}. Run the monitor first.")
+        return
+
+    now = time.time()
+    try:
+        start = parse_time_arg(since, now)
+        end = parse_time_arg(until, now) if until else now
+    except ValueError as e:
+        print(f"Invalid time range: {e}")
+        return
+
+    # Accept a plug name as well as a device ID
+    device_id = device
+    for plug in config.get("plugs", []):
+        if device and plug.get("name") == device:
+            device_id = plug.get("device_id")
+
+    history = HistoryStore(history_file)
+    rows = history.summary(int(start), int(end), device_id)
+    history.close()
+
+    print(f"History from {time.ctime(start)} to {time.ctime(end)}:")
+    if not rows:
+        print("No observations in this range.")
+    for row in rows:
+        last_up = time.ctime(row["last_up"]) if row["last_up"] else "never"
+        print(f"- {row['name'] or row['device_id']}: {row['uptime']:.2%} uptime over {row['samples']} polls, "
+              f"{row['flaps']} flaps, last up {last_up}")
+
+
+# Run one monitor worker process per account config, restarting any that crash.
+# With no config files given, the 'accounts' list in config.json is used.
+def run_supervisor(config_files, concurrency=None):
+    from supervisor import Supervisor
+
+    if not config_files:
+        if os.path.exists(CONFIG_FILE):
+            config_files = load_config().get("accounts", [])
+        if not config_files:
+            print(f"No account configs given and no 'accounts' list in {CONFIG_FILE}.")
+            return
+
+    missing = [path for path in config_files if not os.path.exists(path)]
+    if missing:
+        print(f"Account config not found: {', '.join(missing)}")
+        return
+
+    run_args = ["--concurrency", str(concurrency)] if concurrency else []
+    print(f"{time.ctime()}: Supervising {len(config_files)} accounts: {', '.join(config_files)}")
+    Supervisor(config_files, run_args).run()
 
 
 # Generate and install the systemd unit file for the monitor
@@ -463,38 +1454,94 @@ WantedBy=multi-user.target
 
 
 def main():
+    global CONFIG_FILE
     import argparse
     parser = argparse.ArgumentParser(description="Govee Smart Plug Monitor")
+    parser.add_argument("--config", default=CONFIG_FILE, help=f"Config file to use (default {CONFIG_FILE})")
     subparsers = parser.add_subparsers(dest="command")
 
-    subparsers.add_parser("config", help="Setup configuration")
+    config_parser = subparsers.add_parser("config", help="Setup configuration")
+    config_parser.add_argument("--refresh-devices", action="store_true",
+                               help="Ignore the cached device list and fetch it from Govee")
     check_parser = subparsers.add_parser("check", help="Check configuration and show device states")
     check_parser.add_argument("--notify", action="store_true", help="Send Pushcut notifications on check failures")
+    check_parser.add_argument("--monitored-only", action="store_true", default=None,
+                              help="Only poll the state of monitored devices")
+    check_parser.add_argument("--refresh-devices", action="store_true",
+                              help="Ignore the cached device list and fetch it from Govee")
+    check_parser.add_argument("--changes", action="store_true",
+                              help="Only report devices whose state changed since the last check")
+    check_parser.add_argument("--format", choices=["text", "json", "ndjson"], default="text",
+                              help="Output format (default text)")
+    check_parser.add_argument("--direct", action="store_true",
+                              help="Poll Govee even if a running monitor can answer")
 
     run_parser = subparsers.add_parser("run", help="Run the monitoring loop")
     run_parser.add_argument("--fail-mode", choices=["any", "all"], default="any",
                             help="Fail if 'any' or 'all' plugs are unreachable")
+    run_parser.add_argument("--concurrency", type=int, default=None,
+                            help=f"Maximum concurrent state requests per sweep (default {DEFAULT_CONCURRENCY})")
+    run_parser.add_argument("--sweeps", type=int, default=None, help="Exit after this many sweeps")
+    run_parser.add_argument("--metrics-port", type=int, default=None,
+                            help="Serve Prometheus metrics on this port (also 'metrics_port' in config.json)")
+    run_parser.add_argument("--record", default=None, metavar="FILE",
+                            help="Append raw state responses and timings to this file for 'replay'")
+    run_parser.add_argument("--log-level", choices=["debug", "info", "warning", "error"], default=None,
+                            help="Lowest level of event to log (also 'log_level' in config.json; default info)")
 
     sysd_parser = subparsers.add_parser("generate-systemd", help="Generate a systemd unit file for the monitor")
     sysd_parser.add_argument("--dry-run", action="store_true", help="If set, only print the unit file (default)")
 
+    supervise_parser = subparsers.add_parser("supervise", help="Run one monitor process per Govee account")
+    supervise_parser.add_argument("configs", nargs="*",
+                                  help="Account config files (default: the 'accounts' list in config.json)")
+    supervise_parser.add_argument("--concurrency", type=int, default=None,
+                                  help="Maximum concurrent state requests per account")
+
+    history_parser = subparsers.add_parser("history", help="Show uptime and flap counts from recorded history")
+    history_parser.add_argument("--since", default="24h", help="Start of the range: 90m, 24h, 7d or an ISO date (default 24h)")
+    history_parser.add_argument("--until", default=None, help="End of the range (default now)")
+    history_parser.add_argument("--device", default=None, help="Only show this plug name or device ID")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a recording from 'run --record' without the network")
+    replay_parser.add_argument("recording", help="Recording file")
+    replay_parser.add_argument("--interval", type=float, default=None,
+                               help="Seconds between replayed sweeps (default: 'interval' in config.json)")
+    replay_parser.add_argument("--fail-mode", choices=["any", "all"], default=None,
+                               help="Override 'fail_mode' from config.json")
+    replay_parser.add_argument("--verbose", action="store_true", help="Show the output of every replayed poll")
+
     test_parser = subparsers.add_parser("test-pushcut", help="Send a test notification to Pushcut")
     test_parser.set_defaults(func=test_pushcut)
 
     args = parser.parse_args()
+    CONFIG_FILE = args.config
 
-    if hasattr(args, "func"):
-        args.func()
-    elif args.command == "config":
-        write_config()
-    elif args.command == "check":
-        check_config(getattr(args, "notify", False))
-    elif args.command == "run":
-        run_monitor(fail_mode=args.fail_mode)
-    elif args.command == "generate-systemd":
-        generate_systemd_unit()
-    else:
-        parser.print_help()
+    try:
+        if hasattr(args, "func"):
+            args.func()
+        elif args.command == "config":
+            write_config(refresh_devices=args.refresh_devices)
+        elif args.command == "check":
+            check_config(getattr(args, "notify", False), monitored_only=args.monitored_only,
+                         refresh_devices=args.refresh_devices, changes_only=args.changes, output_format=args.format,
+                         direct=args.direct)
+        elif args.command == "run":
+            run_monitor(fail_mode=args.fail_mode, concurrency=args.concurrency, max_sweeps=args.sweeps,
+                        metrics_port=args.metrics_port, record=args.record, log_level=args.log_level)
+        elif args.command == "replay":
+            replay_recording(args.recording, interval=args.interval, fail_mode=args.fail_mode, verbose=args.verbose)
+        elif args.command == "supervise":
+            run_supervisor(args.configs, concurrency=args.concurrency)
+        elif args.command == "history":
+            show_history(since=args.since, until=args.until, device=args.device)
+        elif args.command == "generate-systemd":
+            generate_systemd_unit()
+        else:
+            parser.print_help()
+    except ConfigError as e:
+        print(f"Invalid config in {CONFIG_FILE}: {e}")
+        exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+DEFAULT_FAIL_WINDOW = 3
+
+TRIPPED = "tripped"
+CLEARED = "cleared"
+
+
+# Sliding-window failure evaluation per device. Each device keeps its last
+# `window` results as bits of an int plus a running count of set bits, so an
+# observation is O(1) whatever the window or fleet size. A device trips when
+# at least `quorum` of its last `window` polls failed (quorum defaults to the
+# whole window, i.e. `window` consecutive failures) and clears when it drops
+# back below. A running count of tripped devices answers the fleet-wide
+# "any"/"all" question without a scan.
+class FailureEvaluator:
+    def __init__(self, window=DEFAULT_FAIL_WINDOW, quorum=None):
+        self.window = max(1, window)
+        self.quorum = min(self.window, quorum or self.window)
+        self.mask = (1 << self.window) - 1
+        self.bits = {}
+        self.counts = {}
+        self.tripped = set()
+
+    # Record one poll result. failed=None (e.g. a throttled poll) is ignored.
+    # Returns TRIPPED or CLEARED when the device crosses the quorum, else None.
+    def observe(self, device_id, failed):
+        if failed is None:
+            return None
+        bits = self.bits.get(device_id, 0)
+        leaving = (bits >> (self.window - 1)) & 1
+        self.bits[device_id] = ((bits << 1) | bool(failed)) & self.mask
+        count = self.counts[device_id] = self.counts.get(device_id, 0) + bool(failed) - leaving
+        if count >= self.quorum:
+            if device_id not in self.tripped:
+                self.tripped.add(device_id)
+                return TRIPPED
+        elif device_id in self.tripped:
+            self.tripped.discard(device_id)
+            return CLEARED
+        return None
+
+    def failures(self, device_id):
+        return self.counts.get(device_id, 0)
+
+    def any_tripped(self):
+        return bool(self.tripped)
+
+    def all_tripped(self, total):
+        return total > 0 and len(self.tripped) >= total
+
+    # Stop tracking a device (e.g. it was removed from the config)
+    def forget(self, device_id):
+        self.bits.pop(device_id, None)
+        self.counts.pop(device_id, None)
+        self.tripped.discard(device_id)
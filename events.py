@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {level: name for name, level in LEVELS.items()}
+
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_LOG_FILE_MAX_BYTES = 10 * 2 ** 20
+DEFAULT_LOG_FILE_BACKUPS = 5
+JOURNAL_SOCKET = "/run/systemd/journal/socket"
+# syslog priorities for journald
+JOURNAL_PRIORITIES = {DEBUG: 7, INFO: 6, WARNING: 4, ERROR: 3}
+
+
+class Event:
+    __slots__ = ("timestamp", "level", "kind", "message", "fields")
+
+    def __init__(self, level, kind, message, fields):
+        self.timestamp = time.time()
+        self.level = level
+        self.kind = kind
+        self.message = message
+        self.fields = fields
+
+
+# Structured, buffered event log for the monitor. emit() drops events below
+# the configured level and otherwise only appends to a deque, so the polling
+# threads never wait on I/O. A background thread hands the buffered events to
+# every sink in batches, every flush_interval seconds or as soon as max_batch
+# events are waiting.
+#
+# Event kinds: "poll" (every poll, DEBUG), "unresponsive", "mismatch",
+# "throttled", "circuit", "alert", "notification", "sweep" and "monitor"
+# (start, reload, stop and errors).
+class EventLog:
+    def __init__(self, sinks, level=INFO, flush_interval=DEFAULT_FLUSH_INTERVAL, max_batch=1000):
+        self.sinks = sinks
+        self.level = level
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.pending = deque()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self.thread.start()
+
+    def wants(self, level):
+        return level >= self.level
+
+    def emit(self, level, kind, message, **fields):
+        if level < self.level:
+            return
+        self.pending.append(Event(level, kind, message, fields))
+        if len(self.pending) >= self.max_batch:
+            self.wake.set()
+
+    def _run(self):
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self._flush()
+
+    def _flush(self):
+        pending = self.pending
+        batch = [pending.popleft() for _ in range(len(pending))]
+        if not batch:
+            return
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                print(f"Error writing events to {type(sink).__name__}: {e}", file=sys.stderr)
+
+    # Write everything still buffered and close the sinks
+    def close(self):
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+        self._flush()
+        for sink in self.sinks:
+            sink.close()
+
+
+# Human-readable lines on stdout, one write and flush per batch
+class ConsoleSink:
+    def write(self, events):
+        sys.stdout.write("".join(f"{time.ctime(event.timestamp)}: {event.message}\n" for event in events))
+        sys.stdout.flush()
+
+    def close(self):
+        pass
+
+
+# One JSON object per event, appended to path. The file is rotated to path.1,
+# path.2, ... once it grows past max_bytes, keeping `backups` old files.
+class NdjsonFileSink:
+    def __init__(self, path, max_bytes=DEFAULT_LOG_FILE_MAX_BYTES, backups=DEFAULT_LOG_FILE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file = open(path, "a", encoding="utf-8")
+        self.size = self.file.tell()
+
+    def write(self, events):
+        data = "".join(
+            json.dumps({"ts": round(event.timestamp, 3), "level": LEVEL_NAMES[event.level], "event": event.kind,
+                        "message": event.message, **event.fields}, default=str) + "\n"
+            for event in events
+        )
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        if self.max_bytes and self.size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self.file.close()
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.size = 0
+
+    def close(self):
+        self.file.close()
+
+
+# Native journald entries: MESSAGE and PRIORITY plus every event field as
+# GOVEE_<FIELD>, so `journalctl GOVEE_EVENT=alert GOVEE_DEVICE=...` works.
+# Sent over journald's datagram socket, so no systemd Python bindings needed.
+class JournalSink:
+    def __init__(self, identifier="govee-monitor", path=JOURNAL_SOCKET):
+        import socket
+        self.identifier = identifier
+        self.path = path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    @staticmethod
+    def _field(name, value):
+        value = str(value).encode()
+        if b"\n" not in value:
+            return name.encode() + b"=" + value + b"\n"
+        # Multi-line values use the length-prefixed binary form
+        return name.encode() + b"\n" + len(value).to_bytes(8, "little") + value + b"\n"
+
+    def write(self, events):
+        for event in events:
+            entry = [
+                self._field("MESSAGE", event.message),
+                self._field("PRIORITY", JOURNAL_PRIORITIES[event.level]),
+                self._field("SYSLOG_IDENTIFIER", self.identifier),
+                self._field("GOVEE_EVENT", event.kind),
+            ]
+            entry += [self._field(f"GOVEE_{key.upper()}", value) for key, value in event.fields.items()
+                      if value is not None]
+            try:
+                self.socket.sendto(b"".join(entry), self.path)
+            except OSError:
+                # journald not running or the entry is too large for a datagram; drop it
+                pass
+
+    def close(self):
+        self.socket.close()
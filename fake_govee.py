@@ -0,0 +1,200 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the Govee developer API and a Pushcut webhook sink, for
+# measuring the monitor without touching the real cloud. It serves:
+#   GET  /v1/devices          the simulated device list (supports If-None-Match)
+#   GET  /v1/devices/state    per-device state, with simulated latency, hangs,
+#                             429s and online/offline flapping
+#   POST /pushcut/<anything>  accepts and counts notifications
+#   GET  /stats               request counters as JSON
+# Point cli.py at it with GOVEE_API_BASE=http://127.0.0.1:<port> and use
+# http://127.0.0.1:<port>/pushcut/test as the Pushcut URL.
+
+
+class FakeGovee:
+    def __init__(self, devices=10, latency=0.05, jitter=0.02, timeout_rate=0.0, hang=30.0, throttle_rate=0.0,
+                 rate_limit=0, flap_rate=0.0, offline_rate=0.0, seed=None):
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.flap_rate = flap_rate
+        self.devices = [
+            {
+                "device": ":".join(f"{b:02X}" for b in i.to_bytes(8, "big")),
+                "model": "H5080",
+                "deviceName": f"Fake Plug {i}",
+                "controllable": True,
+                "retrievable": True,
+                "supportCmds": ["turn"],
+            }
+            for i in range(devices)
+        ]
+        self.state = {
+            d["device"]: {"online": self.random.random() >= offline_rate, "powerState": "on"}
+            for d in self.devices
+        }
+        self.devices_body = json.dumps({"code": 200, "message": "Success", "data": {"devices": self.devices}}).encode()
+        self.devices_etag = f'"{len(self.devices)}-{hash(self.devices_body) & 0xffffffff:x}"'
+        self.window_start = time.time()
+        self.window_count = 0
+        self.remaining = rate_limit
+        self.stats = {"devices": 0, "state": 0, "not_modified": 0, "throttled": 0, "hung": 0, "pushcut": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    # Returns seconds until the per-minute window resets if this request is over quota
+    def _over_quota(self):
+        if not self.rate_limit:
+            return 0
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= 60:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            self.remaining = max(0, self.rate_limit - self.window_count)
+            if self.window_count > self.rate_limit:
+                return int(self.window_start + 60 - now) + 1
+        return 0
+
+    def device_state(self, device_id):
+        state = self.state.get(device_id)
+        if state is None:
+            return None
+        if self.flap_rate and self.random.random() < self.flap_rate:
+            state["online"] = not state["online"]
+        return {
+            "code": 200,
+            "message": "Success",
+            "data": {
+                "device": device_id,
+                "model": "H5080",
+                "properties": [{"online": state["online"]}, {"powerState": state["powerState"]}],
+            },
+        }
+
+    def make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms per request
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on a simulated hang
+                    pass
+
+            def _simulate_latency(self):
+                delay = fake.latency + fake.random.uniform(-fake.jitter, fake.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/v1/devices":
+                    fake._count("devices")
+                    if self.headers.get("If-None-Match") == fake.devices_etag:
+                        fake._count("not_modified")
+                        return self._send(304, headers={"ETag": fake.devices_etag})
+                    self._simulate_latency()
+                    return self._send(200, fake.devices_body, {"ETag": fake.devices_etag})
+                if url.path == "/v1/devices/state":
+                    fake._count("state")
+                    reset = fake._over_quota()
+                    if reset or (fake.throttle_rate and fake.random.random() < fake.throttle_rate):
+                        fake._count("throttled")
+                        return self._send(429, b'{"code": 429, "message": "Too Many Requests"}', {
+                            "API-RateLimit-Remaining": "0",
+                            "API-RateLimit-Reset": str(int(time.time()) + (reset or 1)),
+                            "Retry-After": str(reset or 1),
+                        })
+                    if fake.timeout_rate and fake.random.random() < fake.timeout_rate:
+                        fake._count("hung")
+                        time.sleep(fake.hang)
+                    self._simulate_latency()
+                    device_id = parse_qs(url.query).get("device", [""])[0]
+                    state = fake.device_state(device_id)
+                    if state is None:
+                        return self._send(400, b'{"code": 400, "message": "devices not exist"}')
+                    headers = {}
+                    if fake.rate_limit:
+                        headers["API-RateLimit-Remaining"] = str(fake.remaining)
+                        headers["API-RateLimit-Reset"] = str(int(fake.window_start) + 60)
+                    return self._send(200, json.dumps(state).encode(), headers)
+                if url.path == "/stats":
+                    with fake.lock:
+                        return self._send(200, json.dumps(fake.stats).encode())
+                self._send(404, b'{"code": 404}')
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if urlparse(self.path).path.startswith("/pushcut/"):
+                    fake._count("pushcut")
+                    return self._send(200, b'{"id": "fake"}')
+                self._send(404, b'{"code": 404}')
+
+        return Handler
+
+    # Start serving in a background thread; returns the server (server.server_port has the bound port)
+    def serve(self, host="127.0.0.1", port=0):
+        server = ThreadingHTTPServer((host, port), self.make_handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Govee API and Pushcut sink for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--devices", type=int, default=10, help="Number of simulated devices")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform latency jitter in seconds")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of state requests that hang")
+    parser.add_argument("--hang", type=float, default=30.0, help="How long a hung request sleeps")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of state requests given a 429")
+    parser.add_argument("--rate-limit", type=int, default=0, help="State requests allowed per minute (0 = unlimited)")
+    parser.add_argument("--flap-rate", type=float, default=0.0, help="Chance a device toggles online on each poll")
+    parser.add_argument("--offline-rate", type=float, default=0.0, help="Fraction of devices that start offline")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeGovee(devices=args.devices, latency=args.latency, jitter=args.jitter, timeout_rate=args.timeout_rate,
+                     hang=args.hang, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+                     flap_rate=args.flap_rate, offline_rate=args.offline_rate, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), fake.make_handler())
+    server.daemon_threads = True
+    print(f"Fake Govee API with {args.devices} devices listening on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
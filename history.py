@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+import time
+
+DEFAULT_HISTORY_FILE = "history.db"
+DEFAULT_RAW_RETENTION_DAYS = 30
+
+# Observations are stored one row per poll in a WITHOUT ROWID table clustered on
+# (device, ts), so a per-device time-range query reads one contiguous slice of
+# the b-tree instead of scanning the whole file. Device IDs are interned into
+# small integers, timestamps are whole seconds and power/online are 0/1/NULL,
+# which keeps a row to a few bytes. Raw rows older than the retention window
+# are rolled up into one row per device per day by compact(). New databases
+# use incremental auto-vacuum, so compact() can hand the freed pages back to
+# the filesystem without rewriting the whole file.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    id INTEGER PRIMARY KEY,
+    device_id TEXT NOT NULL UNIQUE,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    device INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    status INTEGER,
+    online INTEGER,
+    power INTEGER,
+    latency_ms INTEGER,
+    PRIMARY KEY (device, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    device INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    up_samples INTEGER NOT NULL,
+    flaps INTEGER NOT NULL,
+    first_up INTEGER,
+    last_up INTEGER,
+    PRIMARY KEY (device, day)
+) WITHOUT ROWID;
+"""
+
+# A poll counts as "up" when Govee answered 200 and didn't report the device
+# offline. Throttled polls (429) say nothing about the device and are skipped.
+UP_SQL = "(status = 200 AND COALESCE(online, 1) = 1)"
+COUNTED_SQL = "(status IS NULL OR status != 429)"
+
+POWER_VALUES = {"on": 1, "off": 0}
+
+
+# Append-only store of check_plug_state observations backed by SQLite in WAL
+# mode. record() is safe to call from polling threads; rows are buffered in
+# memory and written in one transaction per flush().
+class HistoryStore:
+    def __init__(self, path=DEFAULT_HISTORY_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # Only takes effect before the first table is created; older databases
+        # keep auto_vacuum off and reuse their free pages instead
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.device_ids = dict(self.conn.execute("SELECT device_id, id FROM devices"))
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def _device(self, device_id, name=None):
+        key = self.device_ids.get(device_id)
+        if key is None:
+            cursor = self.conn.execute("INSERT INTO devices (device_id, name) VALUES (?, ?)", (device_id, name))
+            key = self.device_ids[device_id] = cursor.lastrowid
+        return key
+
+    # Buffer one observation. latency is in seconds; power is "on"/"off"/None.
+    def record(self, device_id, timestamp, status, online, power, latency, name=None):
+        row = (
+            device_id, name, int(timestamp), status,
+            None if online is None else int(bool(online)),
+            POWER_VALUES.get(power),
+            None if latency is None else int(latency * 1000),
+        )
+        with self.lock:
+            self.pending.append(row)
+
+    # Write all buffered observations in a single transaction
+    def flush(self):
+        with self.lock:
+            rows, self.pending = self.pending, []
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?, ?)",
+                [(self._device(device_id, name), *rest) for device_id, name, *rest in rows],
+            )
+
+    # Roll raw observations older than retention_days up into daily rows, then
+    # delete them and release the freed pages
+    def compact(self, retention_days=DEFAULT_RAW_RETENTION_DAYS):
+        self.flush()
+        cutoff = (int(time.time()) // 86400 - retention_days) * 86400
+        with self.conn:
+            self.conn.execute(f"""
+                INSERT OR REPLACE INTO daily
+                SELECT device, day, COUNT(*), SUM(up), SUM(flap), MIN(CASE WHEN up THEN ts END),
+                       MAX(CASE WHEN up THEN ts END)
+                FROM (
+                    SELECT device, ts, ts / 86400 AS day, up,
+                           up != LAG(up, 1, up) OVER (PARTITION BY device ORDER BY ts) AS flap
+                    FROM (SELECT device, ts, {UP_SQL} AS up FROM observations
+                          WHERE ts < ? AND {COUNTED_SQL})
+                )
+                GROUP BY device, day
+            """, (cutoff,))
+            removed = self.conn.execute("DELETE FROM observations WHERE ts < ?", (cutoff,)).rowcount
+        if removed:
+            # Only truncates free pages at the end of the file, unlike VACUUM,
+            # which rewrites the whole database and would stall the sweep.
+            # executescript steps the pragma to completion; execute() frees
+            # a single page.
+            self.conn.executescript("PRAGMA incremental_vacuum;")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    # Uptime and flap count per device between start and end (epoch seconds).
+    # Whole days that have been compacted come from the daily rollup; the rest
+    # is read from raw observations using the (device, ts) primary key.
+    def summary(self, start, end, device_id=None):
+        self.flush()
+        where, params = "", []
+        if device_id is not None:
+            where = "AND d.device_id = ?"
+            params.append(device_id)
+        raw = self.conn.execute(f"""
+            SELECT device, COUNT(*), SUM(up), SUM(flap), MAX(CASE WHEN up THEN ts END)
+            FROM (
+                SELECT o.device, o.ts, o.up,
+                       o.up != LAG(o.up, 1, o.up) OVER (PARTITION BY o.device ORDER BY o.ts) AS flap
+                FROM (SELECT device, ts, {UP_SQL} AS up FROM observations
+                      WHERE ts >= ? AND ts < ? AND {COUNTED_SQL}) o
+                JOIN devices d ON d.id = o.device
+                WHERE 1 {where}
+            )
+            GROUP BY device
+        """, [start, end, *params]).fetchall()
+        rolled = self.conn.execute(f"""
+            SELECT device, SUM(samples), SUM(up_samples), SUM(flaps), MAX(last_up)
+            FROM daily JOIN devices d ON d.id = daily.device
+            WHERE day * 86400 >= ? AND (day + 1) * 86400 <= ? {where}
+            GROUP BY device
+        """, [start, end, *params]).fetchall()
+
+        totals = {}
+        for device, samples, up, flaps, last_up in [*rolled, *raw]:
+            entry = totals.setdefault(device, [0, 0, 0, None])
+            entry[0] += samples
+            entry[1] += up or 0
+            entry[2] += flaps or 0
+            if last_up is not None:
+                entry[3] = max(entry[3] or 0, last_up)
+        names = {key: (device_id, name) for key, device_id, name in self.conn.execute("SELECT * FROM devices")}
+        return [
+            {
+                "device_id": names[device][0],
+                "name": names[device][1],
+                "samples": samples,
+                "uptime": up / samples if samples else None,
+                "flaps": flaps,
+                "last_up": last_up,
+            }
+            for device, (samples, up, flaps, last_up) in sorted(totals.items())
+        ]
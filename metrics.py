@@ -0,0 +1,171 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Minimal Prometheus text-format exporter for the monitor loop. There are no
+# locks on the update path: every series has a single writer (each device is
+# polled by one worker at a time, sweeps are timed by the run loop and
+# notifications by the dispatcher thread), so plain int/float updates are
+# enough. The scrape handler only reads, and may see a sweep half-applied.
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SWEEP_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels=""):
+        lines = []
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class DeviceMetrics:
+    __slots__ = ("labels", "latency", "errors", "throttled", "online", "power")
+
+    def __init__(self, device_id, name):
+        name = (name or device_id).replace("\\", "\\\\").replace('"', '\\"')
+        self.labels = f'device="{device_id}",name="{name}"'
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.errors = 0
+        self.throttled = 0
+        self.online = None
+        self.power = None
+
+
+class Metrics:
+    def __init__(self):
+        self.devices = {}
+        self.sweep = Histogram(SWEEP_BUCKETS)
+        self.sweep_pacing = 0.0
+        self.notification = Histogram(LATENCY_BUCKETS)
+        self.notifications_failed = 0
+        self.fail_count = 0
+        self._create_lock = threading.Lock()
+
+    def _device(self, device_id, name):
+        device = self.devices.get(device_id)
+        if device is None:
+            with self._create_lock:
+                device = self.devices.setdefault(device_id, DeviceMetrics(device_id, name))
+        return device
+
+    # Same signature as HistoryStore.record, called once per poll by check_plug_state.
+    # Failed requests count towards latency too, since timeouts are the slowest.
+    def record(self, device_id, timestamp, status, online, power, latency, name=None):
+        device = self._device(device_id, name)
+        if latency is None:
+            # Skipped while the device's circuit breaker is open; no request was made
+            device.online = online
+            device.power = power
+            return
+        device.latency.observe(latency)
+        if status == 429:
+            device.throttled += 1
+            return
+        if status != 200:
+            device.errors += 1
+        device.online = online
+        device.power = power
+
+    # Stop exporting a device that is no longer monitored
+    def forget(self, device_id):
+        with self._create_lock:
+            self.devices.pop(device_id, None)
+
+    # paced is the part of the sweep spent spreading poll starts across the
+    # interval (spread_polls or adaptive polling). It is exported on its own so
+    # the duration histogram shows the time actually spent waiting on polls.
+    def observe_sweep(self, seconds, fail_count, paced=0):
+        self.sweep.observe(max(0, seconds - paced))
+        self.sweep_pacing = paced
+        self.fail_count = fail_count
+
+    # Passed to NotificationDispatcher as on_send
+    def observe_notification(self, seconds, delivered):
+        self.notification.observe(seconds)
+        if not delivered:
+            self.notifications_failed += 1
+
+    def render(self):
+        devices = list(self.devices.values())
+        lines = [
+            "# HELP govee_request_duration_seconds Govee state request latency per device.",
+            "# TYPE govee_request_duration_seconds histogram",
+        ]
+        for device in devices:
+            lines += device.latency.render("govee_request_duration_seconds", device.labels)
+        lines += ["# HELP govee_request_errors_total Failed state requests (non-200 or exception) per device.",
+                  "# TYPE govee_request_errors_total counter"]
+        lines += [f"govee_request_errors_total{{{d.labels}}} {d.errors}" for d in devices]
+        lines += ["# HELP govee_requests_throttled_total State requests rejected with HTTP 429 per device.",
+                  "# TYPE govee_requests_throttled_total counter"]
+        lines += [f"govee_requests_throttled_total{{{d.labels}}} {d.throttled}" for d in devices]
+        lines += ["# HELP govee_device_online Whether Govee last reported the device online.",
+                  "# TYPE govee_device_online gauge"]
+        lines += [f"govee_device_online{{{d.labels}}} {int(d.online)}" for d in devices if d.online is not None]
+        lines += ["# HELP govee_device_power_on Whether the device's last reported power state was on.",
+                  "# TYPE govee_device_power_on gauge"]
+        lines += [f"govee_device_power_on{{{d.labels}}} {int(d.power == 'on')}" for d in devices
+                  if d.power is not None]
+        lines += ["# HELP govee_sweep_duration_seconds Time taken to poll every due plug once, excluding pacing.",
+                  "# TYPE govee_sweep_duration_seconds histogram"]
+        lines += self.sweep.render("govee_sweep_duration_seconds")
+        lines += ["# HELP govee_sweep_pacing_seconds Time the last sweep spent spreading poll starts.",
+                  "# TYPE govee_sweep_pacing_seconds gauge",
+                  f"govee_sweep_pacing_seconds {self.sweep_pacing}"]
+        lines += ["# HELP govee_fail_count Plugs currently over their failure threshold.",
+                  "# TYPE govee_fail_count gauge",
+                  f"govee_fail_count {self.fail_count}",
+                  "# HELP govee_notification_duration_seconds Pushcut notification send latency.",
+                  "# TYPE govee_notification_duration_seconds histogram"]
+        lines += self.notification.render("govee_notification_duration_seconds")
+        lines += ["# HELP govee_notifications_failed_total Pushcut send attempts that failed.",
+                  "# TYPE govee_notifications_failed_total counter",
+                  f"govee_notifications_failed_total {self.notifications_failed}"]
+        return "\n".join(lines) + "\n"
+
+    # Serve /metrics from a background thread; returns the server
+    def serve(self, port, host=DEFAULT_METRICS_HOST):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+
+from events import ERROR, WARNING
+
+DEFAULT_COALESCE_WINDOW = 10
+DEFAULT_REPEAT_INTERVAL = 3600
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF = 2
+
+_STOP = object()
+
+
+# Background Pushcut delivery. notify() only takes a lock and enqueues, so the
+# polling loop never waits on Pushcut. The worker thread:
+#   - drops repeats of the same alert state for a device until the device
+#     recovers (resolve()) or repeat_interval has passed
+#   - collects alerts for coalesce_window seconds and sends one summary per
+#     Pushcut URL instead of one notification per plug
+#   - retries failed sends with exponential backoff, up to max_attempts
+# send(url, title, text) must return True when the notification was delivered.
+# If given, on_send(seconds, delivered) is called after every send attempt.
+# clock is used for repeat_interval, so a replay can run on recorded time.
+# Delivery failures go to the EventLog if one is passed, and are printed
+# otherwise.
+class NotificationDispatcher:
+    def __init__(self, send, coalesce_window=DEFAULT_COALESCE_WINDOW, repeat_interval=DEFAULT_REPEAT_INTERVAL,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retry_backoff=DEFAULT_RETRY_BACKOFF, on_send=None,
+                 clock=time.monotonic, events=None):
+        self.send = send
+        self.on_send = on_send
+        self.events = events
+        self.clock = clock
+        self.coalesce_window = coalesce_window
+        self.repeat_interval = repeat_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.queue = queue.Queue()
+        self.last_alert = {}
+        self.lock = threading.Lock()
+        self.sent = self.failed = self.suppressed = 0
+        self.thread = threading.Thread(target=self._run, name="pushcut-dispatcher", daemon=True)
+        self.thread.start()
+
+    # Queue an alert for a device. state identifies the kind of problem (e.g.
+    # "unresponsive", "power:off") so a different problem is still reported.
+    # Returns False if the alert was a duplicate and was dropped.
+    def notify(self, pushcut_url, device_id, state, title, text):
+        if not pushcut_url:
+            return False
+        now = self.clock()
+        with self.lock:
+            alerted = self.last_alert.setdefault(device_id, {})
+            if now - alerted.get(state, -self.repeat_interval) < self.repeat_interval:
+                self.suppressed += 1
+                return False
+            alerted[state] = now
+        self.queue.put((pushcut_url, title, text))
+        return True
+
+    # Forget the alert state of a device that is healthy again
+    def resolve(self, device_id):
+        if device_id in self.last_alert:
+            with self.lock:
+                self.last_alert.pop(device_id, None)
+
+    # Send anything still waiting (including pending retries) and stop the worker
+    def close(self, timeout=None):
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+
+    def _run(self):
+        pending = {}
+        retries = []
+        counter = itertools.count()
+        flush_at = None
+        closing = False
+        while not (closing and not pending and not retries):
+            now = time.monotonic()
+            deadlines = [t for t in (flush_at, retries[0][0] if retries else None) if t is not None]
+            wake_at = min(deadlines) if deadlines else None
+            if not closing:
+                try:
+                    item = self.queue.get(timeout=None if wake_at is None else max(0, wake_at - now))
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    closing = True
+                elif item is not None:
+                    url, title, text = item
+                    pending.setdefault(url, []).append((title, text))
+                    if flush_at is None:
+                        flush_at = time.monotonic() + self.coalesce_window
+            elif wake_at is not None and wake_at > now:
+                time.sleep(wake_at - now)
+
+            now = time.monotonic()
+            if pending and (closing or now >= flush_at):
+                for url, messages in pending.items():
+                    title, text = self._coalesce(messages)
+                    heapq.heappush(retries, (now, next(counter), url, title, text, 1))
+                pending = {}
+                flush_at = None
+            while retries and retries[0][0] <= now:
+                _, _, url, title, text, attempt = heapq.heappop(retries)
+                if self._deliver(url, title, text):
+                    self.sent += 1
+                elif attempt < self.max_attempts:
+                    due = time.monotonic() + self.retry_backoff * 2 ** (attempt - 1)
+                    heapq.heappush(retries, (due, next(counter), url, title, text, attempt + 1))
+                else:
+                    self.failed += 1
+                    self._report(ERROR, f"Giving up on Pushcut notification '{title}' after {attempt} attempts.",
+                                 title=title, attempts=attempt, delivered=False)
+
+    def _report(self, level, message, **fields):
+        if self.events is None:
+            print(message)
+        else:
+            self.events.emit(level, "notification", message, **fields)
+
+    def _deliver(self, url, title, text):
+        started = time.monotonic()
+        try:
+            delivered = bool(self.send(url, title, text))
+        except Exception as e:
+            self._report(WARNING, f"Error sending Pushcut notification: {e}", title=title, error=str(e),
+                         delivered=False)
+            delivered = False
+        if self.on_send is not None:
+            self.on_send(time.monotonic() - started, delivered)
+        return delivered
+
+    @staticmethod
+    def _coalesce(messages):
+        if len(messages) == 1:
+            return messages[0]
+        return f"Govee Monitor: {len(messages)} alerts", "\n".join(text for _, text in messages)
@@ -0,0 +1,62 @@
+from urllib.parse import urlencode
+
+
+# One monitored plug, compiled from its config entry. Settings are resolved
+# once (defaults applied, Pushcut URL inherited from the top-level config) and
+# the state request URL is prebuilt, so polling reads plain slots instead of
+# doing dict lookups and rebuilding params on every sweep. Records are
+# read-only; a config change builds a new table.
+class Plug:
+    __slots__ = ("index", "name", "device_id", "model", "expected_power", "monitor_responsive", "pushcut_url",
+                 "state_url")
+
+    def __init__(self, index, entry, default_pushcut_url, state_url):
+        device_id = entry.get("device_id")
+        model = entry.get("model")
+        query = urlencode({k: v for k, v in (("device", device_id), ("model", model)) if v is not None})
+        init = object.__setattr__
+        init(self, "index", index)
+        init(self, "name", entry.get("name"))
+        init(self, "device_id", device_id)
+        init(self, "model", model)
+        init(self, "expected_power", entry.get("expected_power", "ignore"))
+        init(self, "monitor_responsive", entry.get("monitor_responsive", True))
+        init(self, "pushcut_url", entry.get("pushcut_url", default_pushcut_url))
+        init(self, "state_url", f"{state_url}?{query}" if query else state_url)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Plug records are read-only")
+
+    def __repr__(self):
+        return f"Plug({self.name!r}, {self.device_id!r})"
+
+
+# The config's "plugs" list as a tuple of Plug records in config order, plus a
+# device ID -> index lookup
+class PlugTable:
+    __slots__ = ("plugs", "indexes")
+
+    def __init__(self, entries, default_pushcut_url, state_url):
+        self.plugs = tuple(Plug(i, entry, default_pushcut_url, state_url) for i, entry in enumerate(entries))
+        self.indexes = {plug.device_id: plug.index for plug in self.plugs}
+
+    @classmethod
+    def from_config(cls, config, state_url):
+        return cls(config.get("plugs", []), config.get("pushcut_url", ""), state_url)
+
+    def __len__(self):
+        return len(self.plugs)
+
+    def __iter__(self):
+        return iter(self.plugs)
+
+    def __getitem__(self, index):
+        return self.plugs[index]
+
+    def __contains__(self, device_id):
+        return device_id in self.indexes
+
+    # The plug with this device ID, or None if it isn't monitored
+    def find(self, device_id):
+        index = self.indexes.get(device_id)
+        return None if index is None else self.plugs[index]
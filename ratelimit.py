@@ -0,0 +1,74 @@
+import threading
+import time
+from requests.adapters import HTTPAdapter
+
+# Govee reports the per-minute quota in the API-RateLimit-* headers and the
+# daily quota in the X-RateLimit-* headers; Reset is an epoch timestamp.
+RATE_LIMIT_HEADERS = (
+    ("API-RateLimit-Remaining", "API-RateLimit-Reset"),
+    ("X-RateLimit-Remaining", "X-RateLimit-Reset"),
+)
+
+
+# Token bucket tracking the remaining request quota for one API key. Tokens
+# refill continuously at per_minute / 60 per second, and the bucket is clamped
+# to whatever the server says is left so a shared key can't push us into 429s.
+class RateLimiter:
+    def __init__(self, per_minute):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Block until a request may be sent, then take a token
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    # Update the bucket from the rate-limit headers of a response
+    def update(self, response):
+        now = time.monotonic()
+        with self.lock:
+            for remaining_header, reset_header in RATE_LIMIT_HEADERS:
+                remaining = response.headers.get(remaining_header)
+                if remaining is None or not remaining.isdigit():
+                    continue
+                self.tokens = min(self.tokens, int(remaining))
+                reset = response.headers.get(reset_header, "")
+                if int(remaining) == 0 and reset.isdigit():
+                    self.blocked_until = max(self.blocked_until, now + max(0, int(reset) - time.time()))
+            if response.status_code == 429:
+                self.throttled += 1
+                self.tokens = 0
+                retry_after = response.headers.get("Retry-After", "")
+                # Without a Retry-After, assume the per-minute window has to roll over
+                backoff = int(retry_after) if retry_after.isdigit() else 60
+                self.blocked_until = max(self.blocked_until, now + backoff)
+
+
+# HTTP adapter that takes a rate-limit token before every request and feeds the
+# response headers back into the limiter
+class RateLimitedAdapter(HTTPAdapter):
+    def __init__(self, limiter, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire()
+        response = super().send(request, **kwargs)
+        self.limiter.update(response)
+        return response
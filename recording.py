@@ -0,0 +1,114 @@
+import gzip
+import json
+import threading
+import zlib
+
+# Raw poll recordings for `run --record` and `replay`. A recording is gzipped
+# NDJSON, one JSON array per line:
+#   ["device", n, device_id]          defines device number n
+#   ["body", n, text]                 defines response body number n
+#   [t, device, status, ms, body]     a state response (body may be null)
+#   [t, device, null, ms, null, err]  a request that raised
+# t is the wall-clock start of the request and ms its latency. Device IDs and
+# response bodies are written once and referenced by number afterwards, since
+# a plug returns the same few bodies over and over.
+#
+# Each flush is written as a complete gzip member, so a monitor killed without
+# closing its Recorder loses at most the polls since its last flush, and a
+# later `run --record` to the same file appends cleanly after them.
+
+
+class Recorder:
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        self.devices = {}
+        self.bodies = {}
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    # Called by check_plug_state from poll worker threads
+    def record(self, device_id, timestamp, status, latency, body=None, error=None):
+        latency_ms = round(latency * 1000) if latency is not None else None
+        with self.lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                device = self.devices[device_id] = len(self.devices)
+                self.buffer.append(json.dumps(["device", device, device_id]))
+            if error is not None:
+                self.buffer.append(json.dumps([round(timestamp, 3), device, None, latency_ms, None, error]))
+                return
+            ref = None
+            if body is not None:
+                ref = self.bodies.get(body)
+                if ref is None:
+                    ref = self.bodies[body] = len(self.bodies)
+                    self.buffer.append(json.dumps(["body", ref, body]))
+            self.buffer.append(json.dumps([round(timestamp, 3), device, status, latency_ms, ref]))
+
+    # Write buffered polls; called once per sweep by the run loop
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+        if lines:
+            self.file.write(gzip.compress(("\n".join(lines) + "\n").encode()))
+            self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+# Yield (timestamp, device_id, status, latency, body, error) for every poll in
+# a recording, in file order. A recording cut short by a crash, or with a
+# corrupt gzip member, is read up to the last complete line before the damage.
+def read_recording(path):
+    devices = {}
+    bodies = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                kind = entry[0]
+                if kind == "device":
+                    devices[entry[1]] = entry[2]
+                elif kind == "body":
+                    bodies[entry[1]] = entry[2]
+                else:
+                    latency = entry[3] / 1000 if entry[3] is not None else None
+                    body = bodies.get(entry[4]) if entry[4] is not None else None
+                    error = entry[5] if len(entry) > 5 else None
+                    yield entry[0], devices.get(entry[1]), entry[2], latency, body, error
+        except (EOFError, OSError, zlib.error):
+            # gzip.BadGzipFile is an OSError
+            return
+
+
+# Stands in for a requests.Response when a recorded poll is replayed
+class ReplayResponse:
+    __slots__ = ("status_code", "text", "_data")
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self._data = None
+
+    def json(self):
+        if self._data is None:
+            self._data = json.loads(self.text or "null")
+        return self._data
+
+
+# Stands in for the HTTP session during replay: get() answers with the
+# response (or raises the error) queued for that URL by the replay loop
+class ReplaySession:
+    def __init__(self):
+        self.responses = {}
+
+    def get(self, url, **kwargs):
+        response = self.responses[url]
+        if isinstance(response, Exception):
+            raise response
+        return response
@@ -0,0 +1,139 @@
+import threading
+import time
+
+DEFAULT_ATTEMPT_TIMEOUT = 5
+DEFAULT_RETRIES = 1
+DEFAULT_RETRY_DELAY = 0.25
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN = 300
+DEFAULT_MAX_BREAKER_COOLDOWN = 3600
+DEFAULT_PROBE_TIMEOUT = 3
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+# Per-device circuit breaker. After `threshold` consecutive timeouts or
+# connection errors the breaker opens and the device is not polled at all for
+# `cooldown` seconds. After that, one half-open probe with a short timeout is
+# let through: success closes the breaker, failure re-opens it with the
+# cooldown doubled (up to max_cooldown).
+class CircuitBreaker:
+    __slots__ = ("threshold", "cooldown", "base_cooldown", "max_cooldown", "failures", "state", "opened_at")
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, cooldown=DEFAULT_BREAKER_COOLDOWN,
+                 max_cooldown=DEFAULT_MAX_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+
+    # Returns CLOSED for a normal poll, HALF_OPEN for a probe, or OPEN to skip the poll
+    def before_request(self, now):
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            return HALF_OPEN
+        return self.state if self.state != HALF_OPEN else OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+
+    def record_failure(self, now):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = now
+
+
+# How check_plug_state talks to Govee: a tight per-attempt deadline, retries
+# for transient errors (timeouts, connection errors, 5xx), an optional hedged
+# second request, and one circuit breaker per device.
+class RequestPolicy:
+    def __init__(self, attempt_timeout=DEFAULT_ATTEMPT_TIMEOUT, retries=DEFAULT_RETRIES, hedge_after=None,
+                 retry_delay=DEFAULT_RETRY_DELAY, probe_timeout=DEFAULT_PROBE_TIMEOUT,
+                 breaker_threshold=DEFAULT_BREAKER_THRESHOLD, breaker_cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.hedge_after = hedge_after
+        self.retry_delay = retry_delay
+        self.probe_timeout = probe_timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breakers = {}
+        self._hedge_pool = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            attempt_timeout=config.get("attempt_timeout", DEFAULT_ATTEMPT_TIMEOUT),
+            retries=config.get("retries", DEFAULT_RETRIES),
+            hedge_after=config.get("hedge_after"),
+            probe_timeout=config.get("probe_timeout", DEFAULT_PROBE_TIMEOUT),
+            breaker_threshold=config.get("breaker_threshold", DEFAULT_BREAKER_THRESHOLD),
+            breaker_cooldown=config.get("breaker_cooldown", DEFAULT_BREAKER_COOLDOWN),
+        )
+
+    # Take new settings from a reloaded config. Existing breakers keep their state.
+    def reconfigure(self, config):
+        settings = self.from_config(config)
+        self.attempt_timeout = settings.attempt_timeout
+        self.retries = settings.retries
+        self.hedge_after = settings.hedge_after
+        self.probe_timeout = settings.probe_timeout
+        self.breaker_threshold = settings.breaker_threshold
+        self.breaker_cooldown = settings.breaker_cooldown
+
+    # Stop tracking a device (e.g. it was removed from the config)
+    def forget(self, device_id):
+        self.breakers.pop(device_id, None)
+
+    def breaker(self, device_id):
+        breaker = self.breakers.get(device_id)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.setdefault(
+                    device_id, CircuitBreaker(self.breaker_threshold, self.breaker_cooldown))
+        return breaker
+
+    # Call get(timeout) under this policy and return the response. Raises the
+    # last exception if every attempt failed. A probe gets one short attempt.
+    def call(self, get, probe=False):
+        if probe:
+            return get(self.probe_timeout)
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self._hedged(get) if self.hedge_after else get(self.attempt_timeout)
+                if response.status_code < 500 or last_attempt:
+                    return response
+            except Exception:
+                if last_attempt:
+                    raise
+            time.sleep(self.retry_delay * 2 ** attempt)
+
+    # Send a request; if it hasn't answered within hedge_after seconds, send a
+    # second one and take whichever succeeds first
+    def _hedged(self, get):
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(thread_name_prefix="hedge")
+        pending = {self._hedge_pool.submit(get, self.attempt_timeout)}
+        done, _ = wait(pending, timeout=self.hedge_after)
+        if not done:
+            pending.add(self._hedge_pool.submit(get, self.attempt_timeout))
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
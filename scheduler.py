@@ -0,0 +1,79 @@
+import heapq
+
+DEFAULT_BACKOFF = 1.5
+
+
+# Per-device polling intervals kept in a priority queue of (due time, plug index).
+# A device that polls healthy backs off geometrically from the base interval
+# towards max_interval; one that fails or mismatches drops to min_interval and
+# stays there until it recovers, when it returns to the base interval. A
+# throttled poll (failed is None) says nothing about the device and keeps its
+# interval. If budget_per_minute is set, healthy devices are stretched further
+# whenever the projected request rate of the whole fleet would exceed it, so
+# failing devices keep their fast polls within the budget.
+class AdaptiveScheduler:
+    def __init__(self, count, interval, min_interval, max_interval, now, backoff=DEFAULT_BACKOFF,
+                 budget_per_minute=None):
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.backoff = backoff
+        self.budget = budget_per_minute / 60 if budget_per_minute else None
+        self.intervals = [interval] * count
+        self.rate = count / interval if interval else 0
+        # Stagger the first polls across one base interval instead of bursting them
+        self.heap = [(now + i * interval / max(count, 1), i) for i in range(count)]
+        heapq.heapify(self.heap)
+
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+
+    # Pop up to limit plug indexes that are due at or before now, most overdue first
+    def pop_due(self, now, limit):
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < limit:
+            due.append(heapq.heappop(self.heap)[1])
+        return due
+
+    # Record the result of polling a plug and schedule its next poll
+    def report(self, index, failed, now):
+        current = self.intervals[index]
+        if failed is None:
+            heapq.heappush(self.heap, (now + current, index))
+            return
+        if failed:
+            interval = self.min_interval
+        elif current < self.interval:
+            interval = self.interval
+        else:
+            interval = min(self.max_interval, current * self.backoff)
+            if self.budget:
+                projected = self.rate - 1 / current + 1 / interval
+                if projected > self.budget:
+                    interval *= projected / self.budget
+        self.rate += 1 / interval - 1 / current
+        self.intervals[index] = interval
+        heapq.heappush(self.heap, (now + interval, index))
+
+    # Follow a change to the plug list. mapping maps the old index of every kept
+    # plug to its new one; kept plugs keep their interval and due time, removed
+    # plugs are dropped and new ones are staggered across one base interval.
+    # Must be called between sweeps, when no plug is in flight.
+    def reindex(self, mapping, count, now):
+        intervals = [self.interval] * count
+        heap = []
+        for due, index in self.heap:
+            if index in mapping:
+                intervals[mapping[index]] = self.intervals[index]
+                heap.append((due, mapping[index]))
+        kept = set(mapping.values())
+        added = [i for i in range(count) if i not in kept]
+        heap += [(now + n * self.interval / len(added), i) for n, i in enumerate(added)]
+        heapq.heapify(heap)
+        self.heap = heap
+        self.intervals = intervals
+        self.rate = sum(1 / interval for interval in intervals)
+
+    # Projected steady-state request rate of the fleet, in requests per minute
+    def requests_per_minute(self):
+        return self.rate * 60
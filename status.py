@@ -0,0 +1,146 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+DEFAULT_STATUS_SOCKET = "monitor.sock"
+
+# Latest per-device state and health of a running monitor, served as one JSON
+# document to anything that connects to a Unix socket. Like Metrics, the
+# update path has no locks: each device's record has a single writer (the
+# worker polling it, then the run loop after the sweep), and a reader may see
+# a record half-updated.
+
+
+class DeviceStatus:
+    __slots__ = ("name", "checked_at", "status", "online", "power", "latency", "failures", "alerting", "circuit")
+
+    def __init__(self, name):
+        self.name = name
+        self.checked_at = None
+        self.status = None
+        self.online = None
+        self.power = None
+        self.latency = None
+        self.failures = 0
+        self.alerting = False
+        self.circuit = None
+
+
+class StatusBoard:
+    def __init__(self, interval):
+        self.interval = interval
+        self.started_at = time.time()
+        self.updated_at = None
+        self.sweeps = 0
+        self.devices = {}
+        self.server = None
+        self.path = None
+        self._create_lock = threading.Lock()
+
+    def _device(self, device_id, name):
+        device = self.devices.get(device_id)
+        if device is None:
+            with self._create_lock:
+                device = self.devices.setdefault(device_id, DeviceStatus(name))
+        return device
+
+    # Same signature as HistoryStore.record, called once per poll by check_plug_state
+    def record(self, device_id, timestamp, status, online, power, latency, name=None):
+        if status == 429:
+            # A throttled poll says nothing about the device; keep its last state
+            return
+        device = self._device(device_id, name)
+        device.name = name
+        device.checked_at = timestamp
+        device.status = status
+        device.online = online
+        device.power = power
+        device.latency = latency
+
+    # Called by the run loop after evaluating a plug's poll
+    def update_health(self, device_id, failures, alerting, circuit):
+        device = self.devices.get(device_id)
+        if device is not None:
+            device.failures = failures
+            device.alerting = alerting
+            device.circuit = circuit
+
+    def sweep_done(self, interval):
+        self.interval = interval
+        self.sweeps += 1
+        self.updated_at = time.time()
+
+    def forget(self, device_id):
+        with self._create_lock:
+            self.devices.pop(device_id, None)
+
+    def snapshot(self):
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "interval": self.interval,
+            "sweeps": self.sweeps,
+            "devices": {
+                device_id: {name: getattr(device, name) for name in DeviceStatus.__slots__}
+                for device_id, device in list(self.devices.items())
+            },
+        }
+
+    # Serve snapshots on a Unix socket from a background thread. Returns False
+    # if another live monitor is already serving at path.
+    def serve(self, path):
+        if query_status(path) is not None:
+            return False
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        board = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.wfile.write(json.dumps(board.snapshot()).encode() + b"\n")
+
+        self.server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self.server.daemon_threads = True
+        self.path = path
+        os.chmod(path, 0o600)
+        threading.Thread(target=self.server.serve_forever, name="status", daemon=True).start()
+        return True
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+# Ask a running monitor for its snapshot. Returns None if nothing is listening.
+def query_status(path, timeout=1):
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError:
+        return None
@@ -0,0 +1,86 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+MIN_RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+# A worker that stayed up this long is considered healthy, and its restart backoff resets
+STABLE_RUNTIME = 300
+
+
+# Runs one `cli.py run` worker process per account config and merges their
+# output into a single stream, each line prefixed with the account label.
+# Every worker has its own API key, rate limiter, connection pool and thread
+# pool, so accounts don't share quota and can use separate cores. Workers that
+# exit are restarted with exponential backoff.
+class Supervisor:
+    def __init__(self, config_files, run_args=()):
+        self.accounts = [(os.path.splitext(os.path.basename(path))[0], path) for path in config_files]
+        self.run_args = list(run_args)
+        self.processes = {}
+        self.output_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def emit(self, label, line):
+        with self.output_lock:
+            sys.stdout.write(f"[{label}] {line}")
+            sys.stdout.flush()
+
+    def _start(self, label, path):
+        cli_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+        process = subprocess.Popen(
+            [sys.executable, cli_path, "--config", path, "run", *self.run_args],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+            env=dict(os.environ, PYTHONUNBUFFERED="1"),
+        )
+        self.processes[label] = process
+        return process
+
+    # Keep one account's worker running until the supervisor stops
+    def _watch(self, label, path):
+        delay = MIN_RESTART_DELAY
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            process = self._start(label, path)
+            for line in process.stdout:
+                self.emit(label, line)
+            code = process.wait()
+            if self.stopping.is_set():
+                break
+            if time.monotonic() - started >= STABLE_RUNTIME:
+                delay = MIN_RESTART_DELAY
+            self.emit(label, f"Worker exited with status {code}; restarting in {delay}s\n")
+            if self.stopping.wait(delay):
+                break
+            delay = min(MAX_RESTART_DELAY, delay * 2)
+
+    def stop(self, *_):
+        self.stopping.set()
+        for process in list(self.processes.values()):
+            if process.poll() is None:
+                process.terminate()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        threads = [
+            threading.Thread(target=self._watch, args=(label, path), name=f"worker-{label}", daemon=True)
+            for label, path in self.accounts
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            for process in list(self.processes.values()):
+                try:
+                    process.wait(10)
+                except subprocess.TimeoutExpired:
+                    process.kill()